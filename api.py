@@ -0,0 +1,270 @@
+"""Read-only JSON API over the dashboard data, for embeds that do not need the UI.
+
+A plain WSGI application: any WSGI server can host ``app``, and ``serve``
+runs a threaded stdlib one (``python api.py --port 8502``).
+
+    GET /api/commodities
+    GET /api/supply-map?commodity=Cocoa
+    GET /api/sectors?commodity=Cocoa&lang=tr
+    GET /api/balance?commodity=Cocoa
+    GET /api/facts?commodity=Cocoa&lang=tr
+    GET /api/news?commodity=Cocoa&region=Turkey
+
+Commodity names are normalized as in the app's custom box. Each response is
+serialized once per key and version (the dataset version for catalog data,
+the feed's fetch time for news) and kept, with its strong ETag, in a
+byte-bounded LRU: a repeat request costs a lookup, and one whose
+If-None-Match matches gets a bodiless 304.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import locales
+import metrics
+import news
+import strict_json
+from sized_lru import SizedLRU
+
+# Seconds browsers and CDNs may reuse a response without revalidating.
+CATALOG_MAX_AGE = 3600
+NEWS_MAX_AGE = 60
+RESPONSE_BUDGET = int(os.environ.get("API_CACHE_MB", "64")) * 2**20
+# Longest a request waits on a feed that has never been fetched.
+COLD_FEED_WAIT = 5
+NEWS_FIELDS = ("title", "link", "source", "sources", "published", "summary")
+
+Response = namedtuple("Response", ["status", "body", "etag", "cache_control"])
+
+_STATUS = {200: "200 OK", 304: "304 Not Modified", 400: "400 Bad Request", 404: "404 Not Found",
+           405: "405 Method Not Allowed", 503: "503 Service Unavailable"}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _response(data, max_age, status=200):
+    body = strict_json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:32]
+    return Response(status, body, etag, f"public, max-age={max_age}")
+
+
+def _error(status, message):
+    body = json.dumps({"error": message}).encode("utf-8")
+    return Response(status, body, None, "no-store")
+
+
+def _matches(if_none_match, etag):
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class DashboardAPI:
+    """WSGI application serving catalog data and news as cached JSON.
+
+    The catalog, feed refresher and dedup index are created on first use
+    unless given; the refresher prefetches the preset feeds in the background.
+    """
+
+    def __init__(self, catalog=None, refresher=None, dedup=None, budget=RESPONSE_BUDGET):
+        self._catalog = catalog
+        self._refresher = refresher
+        self._dedup = dedup
+        self._lock = threading.Lock()
+        self.responses = SizedLRU(budget, sizeof=lambda response: len(response.body) + 256)
+        self.routes = {
+            "/api/commodities": self.commodities,
+            "/api/supply-map": self.supply_map,
+            "/api/sectors": self.sectors,
+            "/api/balance": self.balance,
+            "/api/facts": self.facts,
+            "/api/news": self.news,
+        }
+        metrics.register_cache("api_responses", self._cache_stats)
+
+    def _cache_stats(self):
+        stats = self.responses.stats()
+        return stats.hits, stats.misses, stats.entries, stats.evictions, stats.bytes
+
+    # --- RESOURCES ---
+    @property
+    def catalog(self):
+        with self._lock:
+            if self._catalog is None:
+                from catalog import CommodityCatalog
+
+                self._catalog = CommodityCatalog()
+            return self._catalog
+
+    @property
+    def refresher(self):
+        with self._lock:
+            if self._refresher is None:
+                from feed_refresher import FeedRefresher
+                from feed_store import FeedStore
+                from news_archive import NewsArchive
+
+                self._refresher = FeedRefresher(store=FeedStore(), archive=NewsArchive()).start(news.preset_pairs())
+            return self._refresher
+
+    @property
+    def dedup(self):
+        with self._lock:
+            if self._dedup is None:
+                from dedup import DedupIndex
+
+                self._dedup = DedupIndex()
+            return self._dedup
+
+    def cached(self, key, build, max_age):
+        """Response for ``key``, serializing ``build()`` only on the first request."""
+        response = self.responses.get(key)
+        if response is None:
+            response = _response(build(), max_age)
+            self.responses.put(key, response)
+        return response
+
+    # --- ENDPOINTS ---
+    # Each takes the parsed query string and returns a Response.
+    def commodities(self, query):
+        return self.cached(("commodities",), lambda: {
+            "presets": news.PRESETS, "regions": news.REGIONS, "languages": locales.names(),
+        }, CATALOG_MAX_AGE)
+
+    def supply_map(self, query):
+        commodity = _commodity(query)
+        zones = lambda: {"commodity": commodity, "zones": self.catalog.supply_map(commodity).to_dict("records")}
+        return self.cached(("supply-map", commodity, self.catalog.version), zones, CATALOG_MAX_AGE)
+
+    def sectors(self, query):
+        commodity, lang = _commodity(query), _lang(query)
+        build = lambda: {
+            "commodity": commodity, "lang": lang,
+            "sectors": self.catalog.sector_insights(commodity, lang).to_dict("records"),
+        }
+        return self.cached(("sectors", commodity, lang, self.catalog.version), build, CATALOG_MAX_AGE)
+
+    def balance(self, query):
+        commodity = _commodity(query)
+
+        def build():
+            market = self.catalog.market_balance(commodity)
+            return {
+                "commodity": commodity,
+                "market_balance": dict(zip(("production", "consumption", "unit"), market)) if market else None,
+                "forecast": self.catalog.balance_forecast(commodity),
+            }
+        return self.cached(("balance", commodity, self.catalog.version), build, CATALOG_MAX_AGE)
+
+    def facts(self, query):
+        commodity, lang = _commodity(query), _lang(query)
+        build = lambda: {"commodity": commodity, "lang": lang, "facts": dict(self.catalog.facts(commodity, lang))}
+        return self.cached(("facts", commodity, lang, self.catalog.version), build, CATALOG_MAX_AGE)
+
+    def news(self, query):
+        commodity, region = _commodity(query), _param(query, "region", "Global")
+        if region not in news.REGIONS:
+            raise BadRequest(f"region must be one of {', '.join(news.REGIONS)}")
+        feed = self.refresher.get(commodity, region, wait=COLD_FEED_WAIT)
+        if feed.items is None:
+            return _error(503, feed.last_error or "feed not fetched yet")
+
+        def build():
+            with metrics.span("dedup"):
+                items = self.dedup.collapse(feed.items) if feed.items else []
+            return {
+                "commodity": commodity, "region": region, "fetched_at": feed.fetched_at,
+                "items": [{field: item.get(field) for field in NEWS_FIELDS} for item in items],
+            }
+        return self.cached(("news", commodity, region, feed.fetched_at), build, NEWS_MAX_AGE)
+
+    # --- WSGI ---
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        method = environ["REQUEST_METHOD"]
+        handler = self.routes.get(environ.get("PATH_INFO", ""))
+        if handler is None:
+            response = _error(404, "not found")
+        elif method not in ("GET", "HEAD"):
+            response = _error(405, "only GET and HEAD are supported")
+        else:
+            try:
+                response = handler(parse_qs(environ.get("QUERY_STRING", "")))
+            except BadRequest as e:
+                response = _error(400, str(e))
+        status = response.status
+        if status == 200 and _matches(environ.get("HTTP_IF_NONE_MATCH"), response.etag):
+            status = 304
+        headers = [("Cache-Control", response.cache_control), ("Access-Control-Allow-Origin", "*")]
+        if response.etag:
+            headers.append(("ETag", response.etag))
+        body = b"" if status == 304 or method == "HEAD" else response.body
+        if status != 304:
+            headers += [("Content-Type", "application/json; charset=utf-8"),
+                        ("Content-Length", str(len(response.body)))]
+        if status == 405:
+            headers.append(("Allow", "GET, HEAD"))
+        start_response(_STATUS[status], headers)
+        if metrics.ENABLED:
+            metrics.inc("api_requests", route=environ.get("PATH_INFO", "") if handler else "other", status=status)
+            metrics.observe("api_request", time.perf_counter() - start)
+        return [body]
+
+
+def _param(query, name, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _commodity(query):
+    commodity = news.normalize_query(_param(query, "commodity", ""))
+    if not commodity:
+        raise BadRequest("commodity is required")
+    return commodity
+
+
+def _lang(query):
+    lang = _param(query, "lang", "en")
+    if lang not in locales.languages():
+        raise BadRequest(f"lang must be one of {', '.join(locales.languages())}")
+    return lang
+
+
+app = DashboardAPI()
+
+
+# --- SERVER ---
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0", application=None):
+    """Serve the API on a threaded stdlib WSGI server (blocking)."""
+    server = make_server(host, port, application or app, server_class=ThreadingWSGIServer, handler_class=_QuietHandler)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+    serve(args.port, args.host)
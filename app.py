@@ -1,84 +1,37 @@
 import streamlit as st
-import feedparser
-import pandas as pd
-import plotly.express as px
-import numpy as np
-import time
+import math
+import os
 import textwrap
-from bs4 import BeautifulSoup
+import time
+
+import locales
+import metrics
+import news
+import news_grid
+from feed_refresher import FeedRefresher
+from feed_store import FeedStore
+from news_archive import NewsArchive
+
+# The data stack (pandas, numpy, pyarrow, plotly) is imported by the code
+# that first needs it, not here: a new worker paints the header and
+# controls before paying for it. See benchmarks/bench_cold_start.py.
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
     page_title="Letta Earth | Agri-News & Intelligence", 
     layout="wide", 
-    page_icon="🌍",
     initial_sidebar_state="collapsed"
 )
 
-# --- TRANSLATION ENGINE ---
-TRANSLATIONS = {
-    "en": {
-        "title": "Letta Earth Intelligence",
-        "subtitle": "Global Agribusiness Insights & News Aggregation",
-        "select_lbl": "Select Commodity",
-        "custom_lbl": "Type Commodity Name",
-        "source_lbl": "News & Data Source",
-        "supply_zones": "📍 Supply Zones",
-        "sector_insights": "🏭 Sector Insights",
-        "market_balance": "📊 Global Market Balance (Est. 2024/25)",
-        "production": "Production",
-        "consumption": "Consumption",
-        "balance": "Balance",
-        "surplus": "Surplus/Deficit",
-        "fact_sheet": "📋 Product Fact Sheet",
-        "sci_desc": "Scientific Description:",
-        "top_prod": "🌍 Top Producers:",
-        "uses": "🏭 Primary Uses:",
-        "news_header": "📰 Latest News",
-        "read_btn": "Read Article ↗",
-        "no_news": "No recent news found.",
-        "loading": "Fetching latest news...",
-        "sources_foot": "Sources: FAOSTAT, Wikipedia, USDA",
-        "other_opt": "Other (Type Custom)",
-        "global_opt": "Global (English)",
-        "local_opt": "Turkey (Local)",
-        "news_error": "Could not fetch news. Error:"
-    },
-    "tr": {
-        "title": "Letta Earth İstihbarat",
-        "subtitle": "Küresel Tarım İşletmeleri İçgörüleri ve Haber Kaynağı",
-        "select_lbl": "Ürün Seçiniz",
-        "custom_lbl": "Ürün Adı Giriniz",
-        "source_lbl": "Haber ve Veri Kaynağı",
-        "supply_zones": "📍 Tedarik Bölgeleri",
-        "sector_insights": "🏭 Sektörel İçgörüler",
-        "market_balance": "📊 Küresel Pazar Dengesi (Tahmini 2024/25)",
-        "production": "Üretim",
-        "consumption": "Tüketim",
-        "balance": "Denge",
-        "surplus": "Fazla/Açık",
-        "fact_sheet": "📋 Ürün Bilgi Kartı",
-        "sci_desc": "Bilimsel Tanım:",
-        "top_prod": "🌍 En Büyük Üreticiler:",
-        "uses": "🏭 Temel Kullanım Alanları:",
-        "news_header": "📰 Güncel Haberler",
-        "read_btn": "Haberi Oku ↗",
-        "no_news": "Güncel haber bulunamadı.",
-        "loading": "Haberler yükleniyor...",
-        "sources_foot": "Kaynaklar: FAOSTAT, Wikipedia, USDA",
-        "other_opt": "Diğer (Manuel Giriş)",
-        "global_opt": "Küresel (İngilizce)",
-        "local_opt": "Türkiye (Yerel)",
-        "news_error": "Haberler yüklenemedi. Hata:"
-    }
-}
+_page_start = time.perf_counter()
 
 # --- SIDEBAR LANGUAGE SELECTOR ---
 with st.sidebar:
     st.title("Settings / Ayarlar")
-    lang_choice = st.radio("Language / Dil", ["English", "Türkçe"])
-    lang_code = "tr" if lang_choice == "Türkçe" else "en"
-    t = TRANSLATIONS[lang_code]
+    # Only the chosen language is loaded; see locales.py.
+    language_names = locales.names()
+    lang_code = st.radio("Language / Dil", list(language_names), format_func=language_names.get)
+    t = locales.ui(lang_code)
 
 # --- CUSTOM CSS FOR WIX EMBEDDING ---
 hide_streamlit_style = textwrap.dedent("""
@@ -87,420 +40,149 @@ hide_streamlit_style = textwrap.dedent("""
     footer {visibility: hidden;}
     header {visibility: hidden;}
     .block-container {padding-top: 1rem;}
-
-    /* NEWS GRID */
-    .news-card {
-        background-color: white;
-        border: 1px solid #e0e0e0;
-        border-radius: 12px;
-        padding: 20px;
-        margin-bottom: 20px;
-        height: 320px;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-        transition: transform 0.2s, box-shadow 0.2s;
-    }
-    .news-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 20px rgba(0,0,0,0.1);
-        border-color: #4a90e2;
-    }
-    .news-meta {
-        font-size: 11px;
-        color: #95a5a6;
-        margin-bottom: 8px;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        font-weight: 600;
-    }
-    .news-title {
-        font-size: 15px;
-        font-weight: 700;
-        color: #2c3e50;
-        line-height: 1.3;
-        margin-bottom: 10px;
-        overflow: hidden;
-        display: -webkit-box;
-        -webkit-line-clamp: 2;
-        -webkit-box-orient: vertical;
-    }
-    .news-summary {
-        font-size: 13px;
-        color: #555;
-        line-height: 1.5;
-        margin-bottom: 15px;
-        flex-grow: 1;
-        overflow: hidden;
-        display: -webkit-box;
-        -webkit-line-clamp: 4;
-        -webkit-box-orient: vertical;
-    }
-    .read-more-btn {
-        background-color: #f8f9fa;
-        color: #4a90e2;
-        border: 1px solid #4a90e2;
-        padding: 8px 0;
-        border-radius: 6px;
-        text-align: center;
-        font-size: 13px;
-        font-weight: 600;
-        text-decoration: none;
-        display: block;
-        transition: background 0.2s;
-    }
-    .read-more-btn:hover {
-        background-color: #4a90e2;
-        color: white;
-    }
-    a {text-decoration: none;}
-    </style>
-""")
+""") + news_grid.CSS + "</style>\n"
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 
 # --- DATA ENGINE ---
+MAP_ZOOM = 0.5
+MAP_THEME = "streamlit"
+FIGURE_CACHE_SIZE = 64
+
+@st.cache_resource
+def load_catalog():
+    import forecast
+    import scenarios
+    from catalog import CommodityCatalog
+
+    catalog = CommodityCatalog()
+    for name in catalog.cache_info():
+        metrics.register_cache(
+            f"catalog_{name}", lambda name=name: metrics.from_cache_info(catalog.cache_info()[name])
+        )
+    metrics.register_cache("scenarios", metrics.lru_stats(scenarios.simulate))
+    metrics.register_cache("forecasts", forecast.cache_info)
+    return catalog
+
 def get_supply_map_data(commodity):
-    data = {
-        "Hazelnuts": [
-            {"Region": "Giresun, Turkey", "Lat": 40.91, "Lon": 38.38, "Output": "High", "Risk": "Critical (Frost)"},
-            {"Region": "Ordu, Turkey", "Lat": 40.98, "Lon": 37.88, "Output": "High", "Risk": "High (Frost)"},
-            {"Region": "Viterbo, Italy", "Lat": 42.42, "Lon": 12.10, "Output": "Medium", "Risk": "Low"},
-            {"Region": "Oregon, USA", "Lat": 44.94, "Lon": -123.03, "Output": "Low", "Risk": "Low"},
-        ],
-        "Cocoa": [
-            {"Region": "Abidjan, Ivory Coast", "Lat": 5.36, "Lon": -4.00, "Output": "Very High", "Risk": "Medium (Disease)"},
-            {"Region": "Accra, Ghana", "Lat": 5.60, "Lon": -0.18, "Output": "High", "Risk": "High (Drought)"},
-            {"Region": "Sulawesi, Indonesia", "Lat": -2.50, "Lon": 119.50, "Output": "Medium", "Risk": "Low"},
-        ],
-        "Avocados": [
-            {"Region": "Michoacan, Mexico", "Lat": 19.56, "Lon": -101.70, "Output": "Very High", "Risk": "Medium (Cartel/Water)"},
-            {"Region": "La Libertad, Peru", "Lat": -8.10, "Lon": -79.02, "Output": "High", "Risk": "Low"},
-            {"Region": "California, USA", "Lat": 36.77, "Lon": -119.41, "Output": "Medium", "Risk": "High (Drought)"},
-        ],
-        "Coffee": [
-            {"Region": "Minas Gerais, Brazil", "Lat": -18.51, "Lon": -44.55, "Output": "Very High", "Risk": "Medium (Heat)"},
-            {"Region": "Dak Lak, Vietnam", "Lat": 12.66, "Lon": 108.03, "Output": "High", "Risk": "Low"},
-            {"Region": "Huila, Colombia", "Lat": 2.53, "Lon": -75.54, "Output": "Medium", "Risk": "Low"},
-        ],
-        "Wheat": [
-            {"Region": "Kansas, USA", "Lat": 38.50, "Lon": -98.00, "Output": "High", "Risk": "Medium"},
-            {"Region": "Rostov, Russia", "Lat": 47.23, "Lon": 39.70, "Output": "Very High", "Risk": "High (Geopolitics)"},
-        ],
-        "Corn": [
-            {"Region": "Iowa, USA", "Lat": 42.03, "Lon": -93.64, "Output": "Very High", "Risk": "Low"},
-            {"Region": "Mato Grosso, Brazil", "Lat": -12.68, "Lon": -56.09, "Output": "High", "Risk": "Medium"},
-        ],
-        "Cotton": [
-            {"Region": "Texas, USA", "Lat": 31.96, "Lon": -99.90, "Output": "High", "Risk": "Medium (Drought)"},
-            {"Region": "Gujarat, India", "Lat": 22.25, "Lon": 71.19, "Output": "Very High", "Risk": "Medium"},
-            {"Region": "Xinjiang, China", "Lat": 41.11, "Lon": 85.26, "Output": "Very High", "Risk": "Low"},
-        ],
-        "Soybeans": [
-            {"Region": "Mato Grosso, Brazil", "Lat": -12.68, "Lon": -56.09, "Output": "Very High", "Risk": "Low"},
-            {"Region": "Illinois, USA", "Lat": 40.63, "Lon": -89.39, "Output": "High", "Risk": "Low"},
-        ]
-    }
-    return pd.DataFrame(data.get(commodity, []))
+    return load_catalog().supply_map(commodity)
+
+def get_supply_markers(commodity, bbox=None, zoom=MAP_ZOOM):
+    # At most spatial.MAX_MARKERS markers reach the browser, clustered by
+    # zoom; no bbox means the whole world.
+    index = load_catalog().supply_index(commodity)
+    return index.clusters(zoom=zoom) if bbox is None else index.clusters(bbox, zoom)
+
+@st.cache_resource
+def figure_cache():
+    from figures import FigureCache
+
+    cache = FigureCache(maxsize=FIGURE_CACHE_SIZE)
+    metrics.register_cache("figures", lambda: (cache.hits, cache.misses, len(cache), cache.evictions))
+    return cache
+
+def get_supply_map_figure(commodity):
+    # Built once per (commodity, dataset version, theme); reruns reuse the figure.
+    catalog = load_catalog()
+    if not len(catalog.supply_index(commodity)):
+        return None
+    key = ("supply_map", commodity, catalog.version, MAP_THEME)
+    return figure_cache().get_or_build(key, lambda: build_supply_map_figure(commodity))
+
+@metrics.timed("map_figure_build")
+def build_supply_map_figure(commodity):
+    from figures import supply_map_figure
+
+    return supply_map_figure(get_supply_markers(commodity), MAP_ZOOM)
 
 def get_market_balance(commodity):
-    market_data = {
-        "Hazelnuts": [1.35, 1.28, "Million MT"],
-        "Cocoa": [4.90, 5.05, "Million MT"],
-        "Avocados": [9.20, 8.90, "Million MT"],
-        "Coffee": [171.4, 169.5, "Million Bags"],
-        "Wheat": [787.3, 790.2, "Million MT"],
-        "Corn": [1222, 1208, "Million MT"],
-        "Soybeans": [396, 382, "Million MT"],
-        "Palm Oil": [79.5, 77.2, "Million MT"],
-        "Cotton": [113.5, 115.8, "Million Bales"],
-        "Sugar": [183.5, 180.2, "Million MT"],
-    }
-    return market_data.get(commodity, None)
+    return load_catalog().market_balance(commodity)
 
 def get_sector_insights(commodity, lang='en'):
-    insights_en = {
-        "Hazelnuts": [
-            {"Sector": "Confectionery", "Share": 80, "Status": "🔴 Stressed"},
-            {"Sector": "Snacks & Retail", "Share": 15, "Status": "🟡 Caution"},
-            {"Sector": "Cosmetics", "Share": 5, "Status": "🟢 Stable"}
-        ],
-        "Cocoa": [
-             {"Sector": "Chocolate Mfg", "Share": 65, "Status": "🔴 Critical"},
-             {"Sector": "Cosmetics", "Share": 15, "Status": "🟢 Growing"}
-        ],
-        "Avocados": [
-            {"Sector": "Fresh Retail", "Share": 85, "Status": "🟢 Bullish"},
-            {"Sector": "Oil Processing", "Share": 10, "Status": "🟢 Emerging"}
-        ],
-        "Coffee": [
-            {"Sector": "Specialty Roasters", "Share": 20, "Status": "🟠 Strained"},
-            {"Sector": "Instant/Commercial", "Share": 45, "Status": "🟢 Stable"}
-        ],
-        "Wheat": [
-            {"Sector": "Milling & Baking", "Share": 60, "Status": "🟡 Volatile"}
-        ],
-        "Corn": [
-            {"Sector": "Animal Feed", "Share": 55, "Status": "🟢 Abundant"},
-            {"Sector": "Ethanol", "Share": 35, "Status": "🟡 Risk"}
-        ]
-    }
-    
-    insights_tr = {
-        "Hazelnuts": [
-            {"Sector": "Şekerleme & Çikolata", "Share": 80, "Status": "🔴 Kritik"},
-            {"Sector": "Perakende", "Share": 15, "Status": "🟡 Dikkat"},
-            {"Sector": "Kozmetik", "Share": 5, "Status": "🟢 Stabil"}
-        ],
-        "Cocoa": [
-             {"Sector": "Çikolata Üretimi", "Share": 65, "Status": "🔴 Kritik"},
-             {"Sector": "Kozmetik", "Share": 15, "Status": "🟢 Büyüyor"}
-        ],
-        "Avocados": [
-            {"Sector": "Perakende", "Share": 85, "Status": "🟢 Yükselişte"},
-            {"Sector": "Yağ Üretimi", "Share": 10, "Status": "🟢 Gelişiyor"}
-        ],
-        "Coffee": [
-            {"Sector": "Özel Kavurucular", "Share": 20, "Status": "🟠 Zorlu"},
-            {"Sector": "Endüstriyel Kahve", "Share": 45, "Status": "🟢 Stabil"}
-        ],
-        "Wheat": [
-            {"Sector": "Un ve Fırıncılık", "Share": 60, "Status": "🟡 Dalgalı"}
-        ],
-        "Corn": [
-            {"Sector": "Hayvan Yemi", "Share": 55, "Status": "🟢 Bol"},
-            {"Sector": "Etanol", "Share": 35, "Status": "🟡 Riskli"}
-        ]
-    }
-    
-    data_source = insights_tr if lang == 'tr' else insights_en
-    
-    default_en = [{"Sector": "General Market", "Share": 100, "Status": "⚪ Normal"}]
-    default_tr = [{"Sector": "Genel Pazar", "Share": 100, "Status": "⚪ Normal"}]
-    default = default_tr if lang == 'tr' else default_en
-
-    return pd.DataFrame(data_source.get(commodity, default))
+    return load_catalog().sector_insights(commodity, lang)
 
 def get_commodity_facts(commodity, lang='en'):
-    facts_en = {
-        "Hazelnuts": {
-            "producers": "Turkey (~70%), Italy, Azerbaijan.",
-            "uses": "Confectionery, baking, oil extraction.",
-            "desc": "The hazelnut is the nut of the hazel genus, widely used in pralines and spreads."
-        },
-        "Cocoa": {
-            "producers": "Ivory Coast (~40%), Ghana, Indonesia.",
-            "uses": "Chocolate, Cocoa butter, Cocoa powder.",
-            "desc": "Cocoa beans are fermented seeds of Theobroma cacao, essential for chocolate."
-        },
-        "Avocados": {
-            "producers": "Mexico, Peru, Indonesia.",
-            "uses": "Fresh consumption, oil, cosmetics.",
-            "desc": "The avocado is a tree native to the Americas, prized for its rich, oily fruit."
-        },
-        "Coffee": {
-            "producers": "Brazil, Vietnam, Colombia.",
-            "uses": "Beverage, flavoring, caffeine.",
-            "desc": "Coffee is a brewed drink prepared from roasted coffee beans."
-        },
-        "Wheat": {
-            "producers": "China, India, Russia, USA.",
-            "uses": "Flour (bread, pasta), animal feed.",
-            "desc": "Wheat is a grass cultivated worldwide for its seed, a cereal grain staple."
-        },
-        "Corn": {
-            "producers": "USA, China, Brazil.",
-            "uses": "Animal feed, ethanol, food.",
-            "desc": "Maize, also known as corn, is a cereal grain first domesticated in Mexico."
-        },
-        "Cotton": {
-            "producers": "China, India, USA.",
-            "uses": "Textiles, oil, feed.",
-            "desc": "Cotton is a soft, fluffy staple fiber that grows in a boll around seeds."
-        },
-        "Sugar": {
-            "producers": "Brazil, India, EU.",
-            "uses": "Sweetener, ethanol, preservatives.",
-            "desc": "Sugar is the generic name for sweet-tasting, soluble carbohydrates."
-        },
-        "Soybeans": {
-            "producers": "Brazil, USA, Argentina.",
-            "uses": "Animal feed, oil, tofu.",
-            "desc": "The soybean is a species of legume native to East Asia."
-        },
-        "Palm Oil": {
-            "producers": "Indonesia, Malaysia.",
-            "uses": "Cooking oil, biofuels, soap.",
-            "desc": "Palm oil is an edible vegetable oil derived from the mesocarp of oil palms."
-        }
-    }
-
-    facts_tr = {
-        "Hazelnuts": {
-            "producers": "Türkiye (~%70), İtalya, Azerbaycan.",
-            "uses": "Şekerleme, pastacılık, yağ.",
-            "desc": "Fındık, özellikle çikolata ve ezme yapımında kullanılan değerli bir sert kabuklu meyvedir."
-        },
-        "Cocoa": {
-            "producers": "Fildişi Sahili (~%40), Gana, Endonezya.",
-            "uses": "Çikolata, Kakao yağı, toz.",
-            "desc": "Kakao çekirdekleri, çikolatanın ana maddesi olan Theobroma cacao ağacının tohumlarıdır."
-        },
-        "Avocados": {
-            "producers": "Meksika, Peru, Endonezya.",
-            "uses": "Taze tüketim, yağ, kozmetik.",
-            "desc": "Avokado, Amerika kökenli, yağlı meyvesiyle bilinen bir ağaç türüdür."
-        },
-        "Coffee": {
-            "producers": "Brezilya, Vietnam, Kolombiya.",
-            "uses": "İçecek, aroma, kafein.",
-            "desc": "Kahve, kavrulmuş kahve çekirdeklerinden demlenen popüler bir içecektir."
-        },
-        "Wheat": {
-            "producers": "Çin, Hindistan, Rusya.",
-            "uses": "Un (ekmek, makarna), yem.",
-            "desc": "Buğday, tohumu için yetiştirilen ve dünya çapında temel besin olan bir tahıldır."
-        },
-        "Corn": {
-            "producers": "ABD, Çin, Brezilya.",
-            "uses": "Hayvan yemi, etanol, gıda.",
-            "desc": "Mısır, ilk olarak Meksika'da evcilleştirilmiş bir tahıl bitkisidir."
-        },
-        "Cotton": {
-            "producers": "Çin, Hindistan, ABD.",
-            "uses": "Tekstil, yağ, yem.",
-            "desc": "Pamuk, tohumları saran yumuşak, kabarık liflerden oluşan değerli bir bitkidir."
-        },
-        "Sugar": {
-            "producers": "Brezilya, Hindistan, AB.",
-            "uses": "Tatlandırıcı, etanol, koruyucu.",
-            "desc": "Şeker, gıdalarda kullanılan tatlı ve çözünür karbonhidratların genel adıdır."
-        },
-        "Soybeans": {
-            "producers": "Brezilya, ABD, Arjantin.",
-            "uses": "Hayvan yemi, yağ, tofu.",
-            "desc": "Soya fasulyesi, Doğu Asya kökenli, çok yönlü kullanıma sahip bir baklagildir."
-        },
-        "Palm Oil": {
-            "producers": "Endonezya, Malezya.",
-            "uses": "Yemeklik yağ, biyoyakıt, sabun.",
-            "desc": "Palm yağı, yağ palmiyesinin meyvesinden elde edilen bitkisel bir yağdır."
-        }
-    }
+    return load_catalog().facts(commodity, lang)
 
-    data_source = facts_tr if lang == 'tr' else facts_en
-    
-    default_en = {"producers": "Global", "uses": "Various", "desc": "Global commodity."}
-    default_tr = {"producers": "Küresel", "uses": "Çeşitli", "desc": "Küresel emtia."}
-    default = default_tr if lang == 'tr' else default_en
-    
-    return data_source.get(commodity, default)
+def get_balance_forecast(commodity):
+    return load_catalog().balance_forecast(commodity)
 
-# --- NEWS ENGINE ---
-@st.cache_data(ttl=3600)
-def fetch_news(query, region='Global'):
-    if region == 'Turkey':
-        base_url = "https://news.google.com/rss/search?q={}&hl=tr&gl=TR&ceid=TR:tr"
-        translations = {
-            "Hazelnuts": "Fındık fiyatları Giresun Ordu",
-            "Cocoa": "Kakao fiyatları",
-            "Avocados": "Avokado üretimi",
-            "Coffee": "Kahve piyasası",
-            "Wheat": "Buğday fiyatları TMO",
-            "Corn": "Mısır hasadı",
-            "Soybeans": "Soya fasulyesi fiyatları",
-            "Palm Oil": "Palm yağı piyasası",
-            "Cotton": "Pamuk fiyatları Adana",
-            "Sugar": "Şeker pancarı fiyatları"
-        }
-        search_term = translations.get(query, query)
-    else:
-        base_url = "https://news.google.com/rss/search?q={}+commodity+market&hl=en-US&gl=US&ceid=US:en"
-        search_term = query
+def get_balance_scenario(commodity, draws, stress):
+    # scenarios.simulate is memoized on its inputs, i.e. per commodity and scenario.
+    import scenarios
 
-    feed_url = base_url.format(search_term.replace(" ", "%20"))
-    feed = feedparser.parse(feed_url)
-    
-    news_items = []
-    for entry in feed.entries:
-        published_parsed = entry.get('published_parsed', time.gmtime())
-        date_str = time.strftime("%d %b %Y", published_parsed)
-        
-        raw_summary = entry.get('summary', '')
-        clean_summary = ""
-        if raw_summary:
-            try:
-                soup = BeautifulSoup(raw_summary, "html.parser")
-                clean_summary = soup.get_text()
-                if len(clean_summary) > 200:
-                    clean_summary = clean_summary[:200] + "..."
-            except Exception:
-                clean_summary = raw_summary[:200]
-        
-        news_items.append({
-            'title': entry.title,
-            'link': entry.link,
-            'published': date_str,
-            'timestamp': published_parsed,
-            'source': entry.source.title if 'source' in entry else 'Google News',
-            'summary': clean_summary
-        })
-    news_items.sort(key=lambda x: x['timestamp'], reverse=True)
-    return news_items[:12]
+    market = get_market_balance(commodity)
+    if not market:
+        return None
+    zones = get_supply_map_data(commodity)
+    pairs = tuple(zip(zones["Output"], zones["Risk"])) if not zones.empty else ()
+    return scenarios.simulate(market[0], market[1], pairs, scenarios.Scenario(draws=draws, stress=stress))
 
-# --- MAIN APP LAYOUT ---
+# --- NEWS ENGINE ---
+@st.cache_resource
+def feed_store():
+    return FeedStore()
 
-st.title(t["title"])
-st.markdown(t["subtitle"])
+# Longest a page waits on a feed it has never fetched; known feeds never wait.
+COLD_FEED_WAIT = 5
+# Seconds between looks at a first fetch still running when the page gave up waiting.
+PENDING_POLL = 1
 
-# Global Controls
-col1, col2 = st.columns([1, 1])
-with col1:
-    presets_en = ["Hazelnuts", "Cocoa", "Avocados", "Coffee", "Wheat", "Corn", "Soybeans", "Palm Oil", "Cotton", "Sugar", t["other_opt"]]
-    choice = st.selectbox(t["select_lbl"], presets_en)
-    
-    if choice == t["other_opt"]:
-        selected_commodity = st.text_input(t["custom_lbl"], value="Rice")
-    else:
-        selected_commodity = choice
+@st.cache_resource
+def news_archive():
+    return NewsArchive()
 
-with col2:
-    default_idx = 1 if lang_code == 'tr' else 0
-    region_toggle = st.radio(
-        t["source_lbl"], 
-        [t["global_opt"], t["local_opt"]], 
-        index=default_idx,
-        horizontal=True
+@st.cache_data(ttl=600)
+def get_archive_sources():
+    return news_archive().sources()
+
+@st.cache_resource
+def news_refresher():
+    # One per process: serves the last good copy of every feed and refreshes
+    # the presets in the background ahead of their TTL.
+    # Custom queries share a memory budget (NEWS_FEED_BUDGET_MB).
+    refresher = FeedRefresher(store=feed_store(), archive=news_archive()).start(news.preset_pairs())
+    metrics.register_cache(
+        "news_feeds",
+        lambda: (refresher.hits, refresher.misses, len(refresher), refresher.memory().evictions, refresher.memory().bytes),
     )
-    region_code = "Turkey" if region_toggle == t["local_opt"] else "Global"
+    metrics.register_cache("news_cards", metrics.lru_stats(news_grid.render_card))
+    return refresher
 
-st.divider()
+@st.cache_resource
+def dedup_index():
+    # Shared by all feeds, so a story carried in both regions is one story.
+    from dedup import DedupIndex
 
-# --- TOP SECTION: INTELLIGENCE ---
-c_map, c_table = st.columns([1.5, 1])
+    return DedupIndex()
 
-with c_map:
-    st.subheader(f"{t['supply_zones']}: {selected_commodity}")
-    map_df = get_supply_map_data(selected_commodity)
-    if not map_df.empty:
-        fig = px.scatter_mapbox(
-            map_df, lat="Lat", lon="Lon", color="Risk",
-            size=pd.Series([15]*len(map_df)), hover_name="Region",
-            hover_data={"Output": True, "Lat": False, "Lon": False},
-            color_discrete_map={
-                'Critical (Frost)': '#d62728', 'High (Frost)': '#ff7f0e',
-                'High (Drought)': '#ff7f0e', 'High (Geopolitics)': '#ff7f0e',
-                'Medium': '#bcbd22', 'Low': '#2ca02c'
-            }, zoom=0.5, height=350
-        )
-        fig.update_layout(mapbox_style="open-street-map", margin={"r":0,"t":0,"l":0,"b":0})
-        st.plotly_chart(fig, use_container_width=True)
+@metrics.timed("fetch_news")
+def fetch_news(query, region='Global'):
+    feed = news_refresher().get(query, region, wait=COLD_FEED_WAIT)
+    if feed.items:
+        with metrics.span("dedup"):
+            feed = feed._replace(items=dedup_index().collapse(feed.items))
+    return feed
+
+# --- SECTIONS ---
+# Each section is a fragment that depends only on its arguments: a widget
+# inside a section reruns just that section, not the whole script.
+@st.fragment
+@metrics.timed("section_supply_map")
+def supply_map_section(commodity, lang):
+    t = locales.ui(lang)
+    st.subheader(f"{t['supply_zones']}: {commodity}")
+    fig = get_supply_map_figure(commodity)
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True, theme=MAP_THEME)
     else:
         st.warning("Map data not available.")
 
-with c_table:
+@st.fragment
+@metrics.timed("section_sector")
+def sector_section(commodity, lang):
+    t = locales.ui(lang)
     st.subheader(t["sector_insights"])
-    sector_df = get_sector_insights(selected_commodity, lang=lang_code)
+    sector_df = get_sector_insights(commodity, lang=lang)
     st.dataframe(
         sector_df, 
         use_container_width=True, 
@@ -515,10 +197,13 @@ with c_table:
             ),
         }
     )
-    
-    st.write("")
+
+@st.fragment
+@metrics.timed("section_market_balance")
+def market_balance_section(commodity, lang):
+    t = locales.ui(lang)
     st.markdown(f"**{t['market_balance']}**")
-    market_stats = get_market_balance(selected_commodity)
+    market_stats = get_market_balance(commodity)
     
     if market_stats:
         m1, m2, m3 = st.columns(3)
@@ -527,12 +212,42 @@ with c_table:
         m1.metric(t["production"], f"{prod}", unit)
         m2.metric(t["consumption"], f"{cons}", unit)
         m3.metric(t["balance"], f"{balance:+.2f}", t["surplus"], delta_color="normal")
+
+        if st.toggle(t["scenario_mode"]):
+            s1, s2 = st.columns(2)
+            draws = s1.select_slider(t["draws"], [1_000, 10_000, 20_000, 50_000, 100_000], value=20_000)
+            stress = s2.slider(t["stress"], 0.5, 3.0, 1.0, 0.25)
+            result = get_balance_scenario(commodity, draws, stress)
+            q = result.quantiles
+            r1, r2, r3 = st.columns(3)
+            r1.metric(t["deficit_prob"], f"{result.deficit_probability:.0%}")
+            r2.metric(t["median_balance"], f"{q[0.5]:+.2f}", unit, delta_color="off")
+            r3.metric(t["range_90"], f"{q[0.05]:+.2f} … {q[0.95]:+.2f}")
+            import pandas as pd
+
+            edges = result.bin_edges
+            hist_df = pd.DataFrame({
+                t["balance"]: [round((lo + hi) / 2, 3) for lo, hi in zip(edges, edges[1:])],
+                t["draws"]: result.histogram,
+            }).set_index(t["balance"])
+            st.bar_chart(hist_df, height=160)
     else:
         st.caption("N/A")
 
-    st.write("")
+    outlook = get_balance_forecast(commodity)
+    if outlook:
+        for i, year in enumerate(outlook["years"]):
+            lo, hi = outlook["balance_lo"][i], outlook["balance_hi"][i]
+            # No interval for histories too short to estimate the error.
+            interval = f" ({t['interval']}: {lo:+.2f} … {hi:+.2f})" if math.isfinite(lo) and math.isfinite(hi) else ""
+            st.caption(f"{t['forecast']} {year}/{str(year + 1)[2:]}: **{outlook['balance'][i]:+.2f}**{interval}")
+
+@st.fragment
+@metrics.timed("section_fact_sheet")
+def fact_sheet_section(commodity, lang):
+    t = locales.ui(lang)
     st.subheader(t["fact_sheet"])
-    facts = get_commodity_facts(selected_commodity, lang=lang_code)
+    facts = get_commodity_facts(commodity, lang=lang)
     
     html_content = textwrap.dedent(f"""
         <div style="background-color: #f8f9fa; padding: 15px; border-radius: 10px; border: 1px solid #eee;">
@@ -553,35 +268,199 @@ with c_table:
     """)
     st.markdown(html_content, unsafe_allow_html=True)
 
-st.divider()
+def set_news_page(key, page):
+    st.session_state[key] = page
 
-# --- BOTTOM SECTION: NEWS ---
-st.subheader(f"{t['news_header']}: {selected_commodity}")
+def news_pager(page_key, page, pages, total, t):
+    if pages <= 1:
+        return
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    prev_col.button(
+        t["prev_page"], key=f"{page_key}:prev", disabled=page == 0, use_container_width=True,
+        on_click=set_news_page, args=(page_key, page - 1),
+    )
+    info_col.caption(t["page_of"].format(page=page + 1, pages=pages, total=total))
+    next_col.button(
+        t["next_page"], key=f"{page_key}:next", disabled=page >= pages - 1, use_container_width=True,
+        on_click=set_news_page, args=(page_key, page + 1),
+    )
+
+@st.fragment
+@metrics.timed("section_news")
+def news_section(commodity, lang):
+    t = locales.ui(lang)
+    st.subheader(f"{t['news_header']}: {commodity}")
+
+    # Every registered source; the first in the page's language by default.
+    default_idx = next((i for i, region in enumerate(news.REGIONS) if news.SOURCES[region].lang == lang), 0)
+    region_code = st.radio(
+        t["source_lbl"],
+        news.REGIONS,
+        index=default_idx,
+        format_func=lambda region: news.region_label(region, t),
+        horizontal=True
+    )
+
+    try:
+        with st.spinner(t["loading"]):
+            feed = fetch_news(commodity, region=region_code)
+        news_data = feed.items
+
+        if news_data is None:
+            # Never fetched: either the first fetch failed or it is still running.
+            if feed.last_error:
+                st.error(f"{t['news_error']} {feed.last_error}")
+            else:
+                news_pending(commodity, region_code, t)
+        elif not news_data:
+            st.info(t["no_news"])
+        else:
+            updated = time.strftime("%d %b %H:%M", time.localtime(feed.fetched_at))
+            st.caption(f"{t['news_updated']} {updated}")
+            if feed.last_error:
+                st.warning(f"{t['news_stale']} {feed.last_error}")
+            pages = news_grid.page_count(len(news_data))
+            page_key = f"news_page:{commodity}:{region_code}"
+            page = min(st.session_state.get(page_key, 0), pages - 1)
+            with metrics.span("news_cards"):
+                st.markdown(news_grid.render_page(news_data, page, t["read_btn"]), unsafe_allow_html=True)
+            news_pager(page_key, page, pages, len(news_data), t)
+    except Exception as e:
+        st.error(f"{t['news_error']} {e}")
+
+@st.fragment(run_every=PENDING_POLL)
+def news_pending(commodity, region, t):
+    # Nothing else reruns the page when a first fetch lands after the page
+    # stopped waiting for it, so this polls until it has, or has failed.
+    st.info(t["loading"])
+    feed = news_refresher().get(commodity, region)
+    if feed.items is not None or feed.last_error:
+        st.rerun()
+
+# Days back from today; 0 means no limit.
+ARCHIVE_PERIODS = [7, 30, 90, 365, 0]
+
+@st.fragment
+@metrics.timed("section_archive")
+def archive_section(commodity, lang):
+    t = locales.ui(lang)
+    with st.expander(t["archive_header"]):
+        query = st.text_input(t["archive_query"], placeholder=t["archive_hint"])
+        c1, c2, c3 = st.columns([2, 1, 1])
+        options = news.PRESETS + ([commodity] if commodity not in news.PRESETS else [])
+        commodities = c1.multiselect(t["archive_commodities"], options, default=[commodity])
+        regions = c2.multiselect(
+            t["archive_regions"], news.REGIONS, format_func=lambda region: news.region_label(region, t)
+        )
+        days = c3.selectbox(
+            t["archive_period"], ARCHIVE_PERIODS, index=1,
+            format_func=lambda d: t["archive_days"].format(days=d) if d else t["archive_all_time"],
+        )
+        sources = st.multiselect(t["archive_sources"], get_archive_sources())
+
+        filters = (query, tuple(commodities), tuple(regions), days, tuple(sources))
+        page_key = f"archive_page:{hash(filters)}"
+        page = st.session_state.get(page_key, 0)
+        result = news_archive().search(
+            query, commodities=commodities, regions=regions, sources=sources,
+            since=time.time() - days * 86400 if days else None,
+            limit=news_grid.PAGE_SIZE, offset=page * news_grid.PAGE_SIZE,
+        )
+        if not result.items:
+            st.info(t["no_news"])
+            return
+        st.markdown(news_grid.render_page(result.items, 0, t["read_btn"]), unsafe_allow_html=True)
+        total = f"{result.total}+" if result.capped else result.total
+        news_pager(page_key, page, news_grid.page_count(result.total), total, t)
+
+# --- DEBUG PANEL ---
+@st.cache_resource
+def metrics_server():
+    # Prometheus scrape endpoint, one per process, only when a port is configured.
+    port = os.environ.get("DASHBOARD_METRICS_PORT")
+    return metrics.serve(int(port)) if port else None
+
+metrics_server()
+
+# The panel exposes cache contents and upstream hosts, so ?debug=1 alone does
+# not show it: the deployment must also opt in with DASHBOARD_DEBUG.
+DEBUG_PANEL = os.environ.get("DASHBOARD_DEBUG", "").lower() not in ("", "0", "false", "no")
+
+def debug_panel():
+    # Hidden: only rendered for ?debug=1 when DEBUG_PANEL is on.
+    import pandas as pd
+
+    with st.expander("Debug: performance metrics", expanded=True):
+        if not metrics.ENABLED:
+            st.caption("Timing spans are off; set DASHBOARD_METRICS=1 to record them. Cache counters are always on.")
+        spans = metrics.spans()
+        if spans:
+            st.dataframe(pd.DataFrame([
+                {"Span": s.name, "Calls": s.count, "Mean (ms)": s.total / s.count * 1e3, "Max (ms)": s.max * 1e3}
+                for s in spans
+            ]), hide_index=True)
+        st.dataframe(pd.DataFrame([
+            {"Cache": c.name, "Hits": c.hits, "Misses": c.misses, "Size": c.size,
+             "Hit ratio": c.hits / (c.hits + c.misses) if c.hits + c.misses else None,
+             "Evictions": c.evictions, "MB": c.bytes / 2**20 if c.bytes is not None else None}
+            for c in metrics.caches()
+        ]), hide_index=True)
+        st.dataframe(pd.DataFrame(news_refresher().status()), hide_index=True)
+        st.dataframe(pd.DataFrame(news.HTTP.status()), hide_index=True)
+        export = metrics.export_text()
+        st.download_button("metrics.txt", export, file_name="metrics.txt", mime="text/plain")
+        st.code(export, language="text")
+
+# --- MAIN APP LAYOUT ---
 
-try:
-    with st.spinner(t["loading"]):
-        news_data = fetch_news(selected_commodity, region=region_code)
+st.title(t["title"])
+st.markdown(t["subtitle"])
+
+# Global Controls
+col1, _ = st.columns([1, 1])
+with col1:
+    presets_en = news.PRESETS + [t["other_opt"]]
+    choice = st.selectbox(t["select_lbl"], presets_en)
     
-    if not news_data:
-        st.info(t["no_news"])
+    if choice == t["other_opt"]:
+        # Canonical form: "  fındık" is Hazelnuts and "RICE" is "Rice", so
+        # spelling variants share one feed and one set of cache entries.
+        custom = st.text_input(t["custom_lbl"], value="Rice", max_chars=news.MAX_QUERY_LENGTH)
+        selected_commodity = news.normalize_query(custom)
     else:
-        for i in range(0, len(news_data), 3):
-            row_items = news_data[i:i+3]
-            cols = st.columns(3)
-            for idx, item in enumerate(row_items):
-                with cols[idx]:
-                    html_content = textwrap.dedent(f"""
-                        <div class="news-card">
-                            <div>
-                                <div class="news-meta">{item['source']} • {item['published']}</div>
-                                <div class="news-title">{item['title']}</div>
-                                <div class="news-summary">{item['summary']}</div>
-                            </div>
-                            <a href="{item['link']}" target="_blank" class="read-more-btn">
-                                {t['read_btn']}
-                            </a>
-                        </div>
-                    """)
-                    st.markdown(html_content, unsafe_allow_html=True)       
-except Exception as e:
-    st.error(f"{t['news_error']} {e}")
+        selected_commodity = choice
+
+# The favicon goes out once the header and controls are painted: checking an
+# emoji icon makes Streamlit load its emoji catalog, ~70 ms on a new worker.
+st.set_page_config(page_icon="🌍")
+
+if not selected_commodity:
+    st.info(t["custom_lbl"])
+    st.stop()
+
+st.divider()
+
+# --- TOP SECTION: INTELLIGENCE ---
+c_map, c_table = st.columns([1.5, 1])
+
+with c_map:
+    supply_map_section(selected_commodity, lang_code)
+
+with c_table:
+    sector_section(selected_commodity, lang_code)
+    st.write("")
+    market_balance_section(selected_commodity, lang_code)
+    st.write("")
+    fact_sheet_section(selected_commodity, lang_code)
+
+st.divider()
+
+# --- BOTTOM SECTION: NEWS ---
+news_section(selected_commodity, lang_code)
+archive_section(selected_commodity, lang_code)
+
+if metrics.ENABLED:
+    metrics.observe("page", time.perf_counter() - _page_start)
+
+if DEBUG_PANEL and st.query_params.get("debug") == "1":
+    debug_panel()
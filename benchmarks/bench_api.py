@@ -0,0 +1,165 @@
+"""JSON API: per-request cost in process, then throughput at a p99 target.
+
+First every endpoint is called through an in-process WSGI test client:
+  cold          first request (data loaded, serialized and hashed)
+  uncached      data already loaded but serialized on every request
+  cached        repeat request, body reused from the response cache
+  304           repeat request carrying the ETag in If-None-Match
+
+Then api.serve runs on a local port and a closed-loop load generator (one
+connection per request, as the stdlib server speaks HTTP/1.0) steps the
+number of concurrent clients, reporting requests per second and latency
+percentiles for plain GETs and for revalidations. The result line is the
+best throughput whose p99 stays within --p99-ms.
+
+    python benchmarks/bench_api.py --clients 1 4 16 --seconds 3 --p99-ms 50
+"""
+import argparse
+import http.client
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from wsgiref.util import setup_testing_defaults
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api  # noqa: E402
+import news  # noqa: E402
+from feed_refresher import FeedRefresher  # noqa: E402
+from feed_store import FeedStore  # noqa: E402
+from rss_server import RSSServer  # noqa: E402
+
+PATHS = [
+    "/api/commodities",
+    "/api/supply-map?commodity=Cocoa",
+    "/api/sectors?commodity=Cocoa&lang=tr",
+    "/api/balance?commodity=Cocoa",
+    "/api/facts?commodity=Cocoa&lang=en",
+    "/api/news?commodity=Cocoa&region=Global",
+]
+
+
+def call(app, path, etag=None):
+    """(status, headers, body) of one GET through ``app`` without a socket."""
+    environ = {"PATH_INFO": path.partition("?")[0], "QUERY_STRING": path.partition("?")[2],
+               "wsgi.input": io.BytesIO()}
+    if etag:
+        environ["HTTP_IF_NONE_MATCH"] = etag
+    setup_testing_defaults(environ)
+    result = {}
+
+    def start_response(status, headers):
+        result["status"], result["headers"] = int(status[:3]), dict(headers)
+
+    body = b"".join(app(environ, start_response))
+    return result["status"], result["headers"], body
+
+
+def mean_us(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def in_process(app, n):
+    print(f"{'endpoint':<42} {'bytes':>7} {'cold':>9} {'uncached':>9} {'cached':>9} {'304':>9}  (µs)")
+    for path in PATHS:
+        start = time.perf_counter()
+        status, headers, body = call(app, path)
+        cold = (time.perf_counter() - start) * 1e6
+        assert status == 200, (path, status, body)
+        etag = headers["ETag"]
+
+        def uncached():
+            app.responses.clear()
+            call(app, path)
+
+        assert call(app, path, etag)[0] == 304
+        print(f"{path:<42} {len(body):>7} {cold:9.0f} {mean_us(uncached, n):9.1f} "
+              f"{mean_us(lambda: call(app, path), n):9.1f} {mean_us(lambda: call(app, path, etag), n):9.1f}")
+
+
+def load(port, clients, seconds, etags):
+    """(requests per second, p50 ms, p99 ms, errors) of ``clients`` closed-loop clients."""
+    latencies, errors = [], [0]
+    stop = time.perf_counter() + seconds
+    expect = 304 if etags else 200
+
+    def client(offset):
+        mine = []
+        i = offset
+        while time.perf_counter() < stop:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                conn.request("GET", path, headers={"If-None-Match": etags[path]} if etags else {})
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                ok = response.status == expect
+            except OSError:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - start)
+            else:
+                errors[0] += 1
+        latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3 if latencies else float("inf")
+    p50 = statistics.median(latencies) * 1e3 if latencies else float("inf")
+    return len(latencies) / elapsed, p50, p99, errors[0]
+
+
+def run(clients, seconds, p99_ms, n):
+    server = RSSServer(duplicate_every=4).start()
+    news.NEWS_HOST = server.url
+    store = FeedStore(os.path.join(tempfile.mkdtemp(), "news.sqlite3"))
+    app = api.DashboardAPI(refresher=FeedRefresher(store=store))
+    in_process(app, n)
+
+    from wsgiref.simple_server import make_server
+
+    httpd = make_server("127.0.0.1", 0, app, server_class=api.ThreadingWSGIServer, handler_class=api._QuietHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    etags = {path: call(app, path)[1]["ETag"] for path in PATHS}
+
+    print(f"\n{'requests':<12} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, tags in (("GET 200", None), ("GET 304", etags)):
+        best = None
+        for count in clients:
+            rps, p50, p99, errors = load(port, count, seconds, tags)
+            print(f"{label:<12} {count:>7} {rps:8.0f} {p50:8.2f} {p99:8.2f} {errors:>7}")
+            if p99 <= p99_ms and not errors and (best is None or rps > best[0]):
+                best = (rps, count)
+        if best:
+            print(f"{label:<12} best at p99 <= {p99_ms:g} ms: {best[0]:.0f} req/s with {best[1]} clients")
+        else:
+            print(f"{label:<12} no run met p99 <= {p99_ms:g} ms")
+    httpd.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--p99-ms", type=float, default=50)
+    parser.add_argument("--n", type=int, default=500, help="requests per in-process measurement")
+    args = parser.parse_args()
+    run(args.clients, args.seconds, args.p99_ms, args.n)
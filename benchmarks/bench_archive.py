@@ -0,0 +1,92 @@
+"""News archive ingest throughput and search latency at scale.
+
+Fills a temporary archive with synthetic articles, added in feed-sized
+batches as the refresher would, then times typical searches.
+
+    python benchmarks/bench_archive.py --articles 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import news  # noqa: E402
+from news_archive import NewsArchive  # noqa: E402
+from rss_server import SOURCES  # noqa: E402
+
+WORDS = (
+    "frost drought harvest export import tariff price rally slump futures demand supply "
+    "weather rain yield crop shipment port logistics stocks inventory forecast outlook "
+    "hedge funds traders premium discount quality grade origin auction contract delivery"
+).split()
+TR_WORDS = "fındık don kuraklık hasat ihracat fiyat rekolte Giresun Ordu borsa talep arz".split()
+DAY = 86400
+
+
+def synthetic_batches(n, batch=100, seed=7):
+    # A year of coverage arriving in order; the small vocabulary makes every
+    # term match a large share of the archive, a worst case for search.
+    rng = random.Random(seed)
+    end = int(time.time())
+    step = 365 * DAY / n
+    for start in range(0, n, batch):
+        commodity = rng.choice(news.PRESETS)
+        region = rng.choice(news.REGIONS)
+        vocab = TR_WORDS + WORDS if region == "Turkey" else WORDS
+        items = []
+        for i in range(start, min(start + batch, n)):
+            title = f"{commodity} " + " ".join(rng.choices(vocab, k=8))
+            items.append({
+                'guid': f"article-{i}",
+                'title': title,
+                'link': f"https://example.com/{i}",
+                'source': rng.choice(SOURCES),
+                'summary': " ".join(rng.choices(vocab, k=30)),
+                'timestamp': time.gmtime(end - int((n - i) * step) - rng.randrange(DAY)),
+            })
+        yield commodity, region, items
+
+
+def run(articles, runs):
+    path = os.path.join(tempfile.mkdtemp(), "archive.sqlite3")
+    archive = NewsArchive(path)
+
+    start = time.perf_counter()
+    for commodity, region, items in synthetic_batches(articles):
+        archive.add(commodity, region, items)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 2**20
+    print(f"ingest: {articles} articles in {elapsed:.1f}s ({articles / elapsed:,.0f}/s), db {size_mb:.0f} MB")
+
+    now = time.time()
+    queries = {
+        "text": dict(text="frost harvest"),
+        "text + commodity": dict(text="frost", commodities=["Hazelnuts"]),
+        "text newest first": dict(text="drought", order="newest"),
+        "prefix, Turkish folding": dict(text="findik rekol*", regions=["Turkey"]),
+        "text + date + source": dict(text="tariff", since=now - 30 * DAY, sources=["Reuters"]),
+        "filters only": dict(commodities=["Cocoa"], langs=["en"], since=now - 7 * DAY),
+    }
+    print(f"{'query':<26} {'matches':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, kwargs in queries.items():
+        timings = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            result = archive.search(limit=20, **kwargs)
+            timings.append((time.perf_counter() - t0) * 1e3)
+        p95 = statistics.quantiles(timings, n=20, method="inclusive")[-1]
+        print(f"{name:<26} {result.total:>9} {statistics.median(timings):8.2f} {p95:8.2f}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=300_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    run(args.articles, args.runs)
@@ -0,0 +1,94 @@
+"""Reference-data lookups and full-script rerun latency.
+
+Compares rebuilding the per-commodity DataFrames on every call (what the
+data functions used to do) with the shared CommodityCatalog, then times
+headless reruns of the app with news served by the local RSS server.
+
+    python benchmarks/bench_catalog.py [--app path/to/app.py]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rss_server import RSSServer  # noqa: E402
+
+SERVER = RSSServer().start()
+os.environ["NEWS_RSS_HOST"] = SERVER.url
+os.environ.setdefault("NEWS_STORE_PATH", os.path.join(tempfile.mkdtemp(), "news.sqlite3"))
+
+import pandas as pd  # noqa: E402
+
+import catalog  # noqa: E402
+import dataset  # noqa: E402
+import locales  # noqa: E402
+
+with open(dataset.SEED_PATH, encoding="utf-8") as f:
+    SEED = json.load(f)
+LOCALES = {}
+for lang in locales.languages():
+    with open(os.path.join(locales.SOURCE_DIR, f"{lang}.json"), encoding="utf-8") as f:
+        LOCALES[lang] = json.load(f)
+
+PRESETS = list(SEED["market_balance"])
+COMMODITIES = PRESETS + ["Rice"]
+
+
+def rebuild_lookups(commodity, lang):
+    pd.DataFrame(SEED["supply_zones"].get(commodity, []))
+    SEED["market_balance"].get(commodity)
+    strings = LOCALES[lang]
+    sectors = SEED["sector_insights"].get(commodity, catalog.DEFAULT_SECTORS)
+    pd.DataFrame([{"Sector": strings["sectors"][row["sector"]], "Share": row["Share"],
+                   "Status": strings["statuses"][row["status"]]} for row in sectors])
+    dict(strings["facts"].get(commodity, strings["default_facts"]))
+
+
+def catalog_lookups(cat, commodity, lang):
+    cat.supply_map(commodity)
+    cat.market_balance(commodity)
+    cat.sector_insights(commodity, lang)
+    cat.facts(commodity, lang)
+
+
+def bench_lookups(number=200):
+    cat = catalog.CommodityCatalog()
+    pairs = [(c, lang) for c in COMMODITIES for lang in locales.languages()]
+    rebuild = min(timeit.repeat(lambda: [rebuild_lookups(c, l) for c, l in pairs], number=number // 10, repeat=3))
+    cached = min(timeit.repeat(lambda: [catalog_lookups(cat, c, l) for c, l in pairs], number=number, repeat=3))
+    rebuild_us = rebuild / (number // 10) / len(pairs) * 1e6
+    cached_us = cached / number / len(pairs) * 1e6
+    print(f"data lookups per rerun  rebuild: {rebuild_us:8.1f} us   catalog: {cached_us:6.2f} us")
+    return {"rebuild_us": rebuild_us, "catalog_us": cached_us}
+
+
+def bench_reruns(app, runs=20):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app, default_timeout=60).run()
+    timings = []
+    for i in range(runs):
+        at.selectbox[0].select(PRESETS[i % len(PRESETS)])
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    p50 = statistics.median(timings) * 1e3
+    print(f"commodity-switch rerun p50: {p50:.1f} ms over {runs} runs")
+    return {"rerun_p50_ms": p50}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    bench_lookups()
+    bench_reruns(os.path.abspath(args.app), args.runs)
+    SERVER.shutdown()
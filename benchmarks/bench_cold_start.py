@@ -0,0 +1,146 @@
+"""Cold start of a fresh worker: time to first paint and import profile.
+
+Each run starts a new interpreter that, like a freshly spawned Streamlit
+worker, has Streamlit itself loaded and nothing else, and renders app.py
+once with news served by the fixture RSS server. Reported per run:
+
+  first paint   script start until the page title is emitted
+  full render   script start until the whole page has rendered
+  heavy modules which of numpy, pandas, pyarrow, plotly.express and
+                feedparser were already imported at first paint
+
+plus the slowest imports done by the script (from ``python -X importtime``).
+The same is measured for a bare page (page config and title only), whose
+first paint is the floor set by Streamlit and the test harness. Exits
+non-zero when the app's p50 first paint exceeds the floor by more than
+FIRST_PAINT_BUDGET_MS.
+
+    python benchmarks/bench_cold_start.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# First paint over the bare page on a cold worker. The title must not wait
+# on the data stack (pandas alone takes ~450 ms to import).
+FIRST_PAINT_BUDGET_MS = 100
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "plotly.express", "feedparser"]
+MARKER = "--- app script ---"
+BARE_PAGE = """import streamlit as st
+st.set_page_config(page_title="Bare", layout="wide", page_icon=":material/public:")
+st.title("Bare")
+"""
+
+
+def child(app):
+    from rss_server import RSSServer
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    server = RSSServer().start()
+    os.environ["NEWS_RSS_HOST"] = server.url
+    os.environ["NEWS_STORE_PATH"] = os.path.join(os.path.dirname(app), ".cache", f"cold-{os.getpid()}.sqlite3")
+    paint = {}
+    title = st.title
+
+    def timed_title(*args, **kwargs):
+        if "seconds" not in paint:
+            paint["seconds"] = time.perf_counter() - start
+            paint["heavy"] = [name for name in HEAVY_MODULES if name in sys.modules]
+        return title(*args, **kwargs)
+
+    st.title = timed_title
+    at = AppTest.from_file(app, default_timeout=120)
+    sys.stderr.write(MARKER + "\n")
+    sys.stderr.flush()
+    start = time.perf_counter()
+    at.run()
+    total = time.perf_counter() - start
+    server.shutdown()
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(os.environ["NEWS_STORE_PATH"] + suffix)
+        except OSError:
+            pass
+    print(json.dumps({
+        "first_paint": paint.get("seconds"), "full_render": total, "heavy": paint.get("heavy"),
+        "errors": [str(e.value) for e in at.exception],
+    }))
+
+
+def import_profile(stderr):
+    """Top-level imports done after MARKER as (module, cumulative microseconds)."""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        name = parts[2].rstrip()
+        cumulative = parts[1].strip()
+        # Nested imports are indented under their parent.
+        if cumulative.isdigit() and name.startswith(" ") and not name.startswith("  "):
+            imports.append((name.strip(), int(cumulative)))
+    return imports
+
+
+def measure(app, runs):
+    """p50 first paint and full render (ms), heavy modules and import profile of ``runs`` cold runs."""
+    first_paint, full_render, profile = [], [], {}
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", __file__, "--child", "--app", app],
+            check=True, capture_output=True, text=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if result["errors"]:
+            raise RuntimeError(f"app raised: {result['errors'][0]}")
+        first_paint.append(result["first_paint"] * 1e3)
+        full_render.append(result["full_render"] * 1e3)
+        for name, us in import_profile(out.stderr):
+            profile.setdefault(name, []).append(us / 1e3)
+    profile = sorted(((name, statistics.median(ms)) for name, ms in profile.items()), key=lambda row: -row[1])
+    return statistics.median(first_paint), statistics.median(full_render), result["heavy"], profile
+
+
+def run(app, runs, top):
+    with tempfile.TemporaryDirectory() as tmp:
+        bare = os.path.join(tmp, "bare.py")
+        with open(bare, "w", encoding="utf-8") as f:
+            f.write(BARE_PAGE)
+        floor, _, _, _ = measure(bare, runs)
+    first_paint, full_render, heavy, profile = measure(app, runs)
+
+    over = first_paint - floor
+    print(f"first paint  p50 {first_paint:7.1f} ms  (bare page {floor:.1f} ms, "
+          f"+{over:.1f} ms, budget +{FIRST_PAINT_BUDGET_MS} ms)")
+    print(f"full render  p50 {full_render:7.1f} ms")
+    print(f"heavy modules loaded before first paint: {', '.join(heavy) or 'none'}")
+    print("\nslowest imports during the script (p50 cumulative ms):")
+    for name, ms in profile[:top]:
+        print(f"  {name:<40} {ms:8.1f}")
+    return over <= FIRST_PAINT_BUDGET_MS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(os.path.abspath(args.app))
+    else:
+        sys.exit(0 if run(os.path.abspath(args.app), args.runs, args.top) else 1)
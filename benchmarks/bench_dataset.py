@@ -0,0 +1,81 @@
+"""Columnar dataset at scale: build time, lookup latency and resident memory.
+
+Generates a synthetic seed with many commodities (several supply regions
+each), builds the Arrow dataset from it and times random catalog lookups.
+
+    python benchmarks/bench_dataset.py --commodities 5000 --regions 8
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog  # noqa: E402
+import dataset  # noqa: E402
+
+RISKS = ["Low", "Medium", "High (Frost)", "High (Drought)", "Critical (Frost)", "Medium (Disease)"]
+OUTPUTS = ["Low", "Medium", "High", "Very High"]
+
+
+def synthetic_seed(commodities, regions, rng):
+    seed = {"supply_zones": {}, "market_balance": {}, "sector_insights": {}}
+    for c in range(commodities):
+        name = f"Commodity {c:05d}"
+        seed["supply_zones"][name] = [
+            {"Region": f"Region {c}-{r}", "Lat": rng.uniform(-60, 70), "Lon": rng.uniform(-180, 180),
+             "Output": rng.choice(OUTPUTS), "Risk": rng.choice(RISKS)}
+            for r in range(regions)
+        ]
+        production = round(rng.uniform(1, 1000), 2)
+        seed["market_balance"][name] = {"production": production, "consumption": round(production * rng.uniform(0.9, 1.1), 2), "unit": "Million MT"}
+        seed["sector_insights"][name] = [{"sector": f"sector_{s}", "Share": 30, "status": "stable"} for s in range(3)]
+    return seed
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current RSS, but still bounds the growth.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(commodities, regions, lookups):
+    rng = random.Random(42)
+    seed = synthetic_seed(commodities, regions, rng)
+    out_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    dataset.write_dataset(seed, out_dir, "bench")
+    build_s = time.perf_counter() - start
+    names = list(seed["market_balance"])
+    del seed
+    gc.collect()
+
+    rss_before = rss_mb()
+    cat = catalog.CommodityCatalog(dataset.ColumnarDataset(out_dir))
+    start = time.perf_counter()
+    for _ in range(lookups):
+        name = rng.choice(names)
+        cat.supply_map(name)
+        cat.market_balance(name)
+        cat.sector_insights(name, "tr")
+        cat.facts(name, "en")
+    per_lookup_us = (time.perf_counter() - start) / lookups * 1e6
+    print(f"{commodities} commodities x {regions} regions: built in {build_s:.2f}s")
+    print(f"cold lookup (4 lookups): {per_lookup_us:.0f} us   RSS growth while serving: {rss_mb() - rss_before:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commodities", type=int, default=5000)
+    parser.add_argument("--regions", type=int, default=8)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.commodities, args.regions, args.lookups)
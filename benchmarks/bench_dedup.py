@@ -0,0 +1,89 @@
+"""Near-duplicate detection: LSH lookups vs. comparing every pair.
+
+Indexes synthetic news where every 5th item is another outlet's copy of the
+one before it, then reports the per-item cost as the index grows (it should
+stay flat) against an all-pairs MinHash comparison, and how many of the
+planted copies were found.
+
+    python benchmarks/bench_dedup.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import dedup  # noqa: E402
+from rss_server import SOURCES, headline  # noqa: E402
+
+COMMODITIES = ["Hazelnuts", "Cocoa", "Coffee", "Wheat", "Corn", "Sugar", "Cotton", "Soybeans"]
+
+
+def synthetic_items(n, duplicate_every=5):
+    items = []
+    for i in range(n):
+        copy = i and i % duplicate_every == 0
+        story = i - 1 if copy else i
+        query = COMMODITIES[story % len(COMMODITIES)]
+        title = headline(query, story) + (" - update" if copy else "")
+        items.append({
+            'guid': f"item-{i}",
+            'link': f"https://example.com/{i}",
+            'title': title,
+            'summary': f"{title}\xa0\xa0{SOURCES[i % len(SOURCES)]}",
+            'source': SOURCES[i % len(SOURCES)],
+            'story': story,
+        })
+    return items
+
+
+def bench_index(items, probe=1000):
+    index = dedup.DedupIndex(max_items=len(items))
+    start = time.perf_counter()
+    for item in items[:-probe]:
+        index.add(item)
+    fill = time.perf_counter() - start
+    start = time.perf_counter()
+    for item in items[-probe:]:
+        index.add(item)
+    per_item = (time.perf_counter() - start) / probe
+    return index, fill, per_item
+
+
+def bench_all_pairs(items, probe=200):
+    # The same MinHash comparison without LSH: every new item against all earlier ones.
+    signatures = np.array([dedup.signature(dedup.item_text(item)) for item in items[:-probe]])
+    start = time.perf_counter()
+    for item in items[-probe:]:
+        sig = dedup.signature(dedup.item_text(item))
+        np.flatnonzero((signatures == sig).mean(axis=1) >= dedup.THRESHOLD)
+    return (time.perf_counter() - start) / probe
+
+
+def accuracy(index, items):
+    by_story = {}
+    for item in items:
+        by_story.setdefault(item['story'], []).append(item['guid'])
+    planted = [guids for guids in by_story.values() if len(guids) > 1]
+    found = sum(index.story(a) == index.story(b) for a, b in planted)
+    stories = {index.story(item['guid']) for item in items}
+    return found / len(planted), len(by_story) - len(stories)
+
+
+def run(sizes):
+    print(f"{'items':>8} {'LSH us/item':>12} {'all-pairs us/item':>18} {'copies found':>13} {'false merges':>13}")
+    for n in sizes:
+        items = synthetic_items(n)
+        index, _, per_item = bench_index(items)
+        pairs = bench_all_pairs(items)
+        recall, false_merges = accuracy(index, items)
+        print(f"{n:>8} {per_item * 1e6:12.1f} {pairs * 1e6:18.1f} {recall:12.1%} {false_merges:>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2_000, 20_000, 100_000])
+    run(parser.parse_args().sizes)
@@ -0,0 +1,75 @@
+"""Feed memory under a flood of custom commodity queries.
+
+Simulates visitors typing free text into the custom commodity box: a mix of
+preset names in other spellings, cases and languages and an endless stream
+of made-up queries. Every query is served through a FeedRefresher whose
+fetch returns a full synthetic feed, with and without query normalization
+and the memory budget, and the traced memory of the feeds is reported.
+
+    python benchmarks/bench_feed_memory.py --requests 1500 --budget-mb 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import news  # noqa: E402
+from feed_refresher import FeedRefresher  # noqa: E402
+from rss_server import SOURCES, headline  # noqa: E402
+
+VARIANTS = ["  fındık", "FINDIK", "hazelnut", "Hazelnuts ", "palm  oil", "Palm yağı", "soybean", "Kakao", "rice", "RICE", " Rice "]
+
+
+def fake_fetch(query, region='Global', **kwargs):
+    now = time.gmtime()
+    return [
+        {
+            'guid': f"{query}/{region}/{n}",
+            'title': headline(query, n),
+            'link': f"https://example.com/{n}",
+            'published': time.strftime("%d %b %Y", now),
+            'timestamp': now,
+            'source': SOURCES[n % len(SOURCES)],
+            'summary': headline(query, n) * 3,
+        }
+        for n in range(news.MAX_ITEMS)
+    ]
+
+
+def queries(n, seed=11):
+    rng = random.Random(seed)
+    for i in range(n):
+        # One request in three is a variant of a known name, the rest is noise.
+        yield rng.choice(VARIANTS) if i % 3 == 0 else f"commodity {rng.randrange(10**9)}"
+
+
+def run(requests, budget_mb, normalize):
+    refresher = FeedRefresher(budget=budget_mb * 2**20 if budget_mb else float("inf"),
+                              max_feeds=None if not budget_mb else 256, fetch=fake_fetch)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for query in queries(requests):
+        refresher.get(news.normalize_query(query) if normalize else query, wait=5)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    refresher.stop()
+    stats = refresher.memory()
+    label = f"{'normalized' if normalize else 'raw':>10} {f'{budget_mb} MB' if budget_mb else 'unbounded':>10}"
+    print(f"{label} {len(refresher):>7} {stats.evictions:>9} {stats.bytes / 2**20:10.1f} "
+          f"{current / 2**20:10.1f} {peak / 2**20:10.1f} {elapsed / requests * 1e3:8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1500)
+    parser.add_argument("--budget-mb", type=int, default=8)
+    args = parser.parse_args()
+    print(f"{'queries':>10} {'budget':>10} {'feeds':>7} {'evicted':>9} {'est. MB':>10} "
+          f"{'heap MB':>10} {'peak MB':>10} {'ms/req':>8}")
+    run(args.requests, 0, normalize=False)
+    run(args.requests, args.budget_mb, normalize=True)
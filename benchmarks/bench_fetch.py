@@ -0,0 +1,48 @@
+"""Serial vs. batched news fetching against the local stand-in RSS server.
+
+    python benchmarks/bench_fetch.py --latency 0.25
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_server import RSSServer  # noqa: E402
+
+import news  # noqa: E402
+
+
+def run(latency, items, workers, rounds):
+    server = RSSServer(latency=latency, items=items).start()
+    news.NEWS_HOST = server.url
+    pairs = news.preset_pairs()
+
+    results = {}
+    for label, fn in (
+        ("serial", lambda: [news.fetch_feed(q, r) for q, r in pairs]),
+        ("batch", lambda: news.fetch_news_batch(pairs, max_workers=workers)),
+    ):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results[label] = best
+        print(f"{label:>6}: {best:.3f}s for {len(pairs)} feeds  ({len(pairs) / best:.1f} feeds/s)")
+
+    print(f"speedup: {results['serial'] / results['batch']:.1f}x")
+    server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=news.MAX_WORKERS)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    run(args.latency, args.items, args.workers, args.rounds)
@@ -0,0 +1,59 @@
+"""Per-rerun cost of the supply map with and without the figure cache.
+
+Both paths include the work st.plotly_chart does on every rerun (turning
+the figure into a dict and serializing it to JSON).
+
+    python benchmarks/bench_figures.py
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plotly.io as pio  # noqa: E402
+import plotly.tools  # noqa: E402
+
+import catalog  # noqa: E402
+from figures import FigureCache, supply_map_figure  # noqa: E402
+
+ZOOM = 0.5
+
+
+def plotly_chart_work(figure):
+    # What st.plotly_chart does with the figure it is given.
+    figure = plotly.tools.return_figure_from_figure_or_data(figure, validate_figure=True)
+    return pio.to_json(figure, validate=False)
+
+
+def run(number):
+    cat = catalog.CommodityCatalog()
+    cache = FigureCache()
+    commodities = [c for c in ("Hazelnuts", "Cocoa", "Coffee", "Wheat") if len(cat.supply_index(c))]
+
+    def uncached():
+        for c in commodities:
+            plotly_chart_work(supply_map_figure(cat.supply_index(c).clusters(zoom=ZOOM), ZOOM))
+
+    def cached():
+        for c in commodities:
+            figure = cache.get_or_build(
+                ("supply_map", c, cat.version, "streamlit"),
+                lambda: supply_map_figure(cat.supply_index(c).clusters(zoom=ZOOM), ZOOM),
+            )
+            plotly_chart_work(figure)
+
+    cached()
+    per = 1e3 / number / len(commodities)
+    before = min(timeit.repeat(uncached, number=number, repeat=3)) * per
+    after = min(timeit.repeat(cached, number=number, repeat=3)) * per
+    print(f"supply map per rerun  rebuilt: {before:6.2f} ms   cached: {after:6.2f} ms   saved: {before - after:6.2f} ms")
+    print(f"cache: {cache.hits} hits, {cache.misses} misses")
+    return {"rebuilt_ms": before, "cached_ms": after}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20)
+    run(parser.parse_args().number)
@@ -0,0 +1,98 @@
+"""Batched forecasting vs. fitting one commodity at a time.
+
+Before timing, checks the catalog's forecasts end to end on a dataset built
+with balance histories of uneven length (the seed's all end in the same
+year): a history that ends early must still be forecast for the years
+after the last one, and one with a single point gets no interval.
+
+    python benchmarks/bench_forecast.py --commodities 2000 --years 20
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset  # noqa: E402
+import forecast  # noqa: E402
+from catalog import CommodityCatalog  # noqa: E402
+
+
+def synthetic_histories(commodities, years, rng):
+    t = np.arange(years)
+    base = rng.uniform(1, 1000, (commodities, 1))
+    growth = rng.normal(0.01, 0.02, (commodities, 1))
+    production = base * (1 + growth) ** t * rng.normal(1, 0.03, (commodities, years))
+    consumption = production * rng.normal(0.99, 0.02, (commodities, years))
+    # Ragged starts, as real histories have.
+    for i, start in enumerate(rng.integers(0, years // 2, commodities)):
+        production[i, :start] = consumption[i, :start] = np.nan
+    return [f"C{i}" for i in range(commodities)], list(range(2024 - years + 1, 2025)), production, consumption
+
+
+def check_catalog():
+    with open(dataset.SEED_PATH, encoding="utf-8") as f:
+        seed = json.load(f)
+    seed["balance_history"] = {
+        # Linear, ending in 2021: 2025-2027 are 4-6 steps past its last year.
+        "Cocoa": [{"year": y, "production": y - 2005.0, "consumption": y - 2007.0} for y in range(2015, 2022)],
+        "Coffee": [{"year": y, "production": 50.0, "consumption": 40.0} for y in range(2015, 2025)],
+        "Tea": [{"year": 2024, "production": 5.0, "consumption": 6.0}],
+    }
+    out_dir = tempfile.mkdtemp()
+    try:
+        dataset.write_dataset(seed, out_dir, "check")
+        cat = CommodityCatalog(dataset.ColumnarDataset(out_dir))
+        cocoa, coffee, tea = (cat.balance_forecast(name) for name in ("Cocoa", "Coffee", "Tea"))
+    finally:
+        shutil.rmtree(out_dir)
+    assert cat.balance_forecast("Hazelnuts") is None
+    assert cocoa["years"] == coffee["years"] == tea["years"] == [2025, 2026, 2027], cocoa["years"]
+    assert np.allclose(cocoa["production"], [20, 21, 22]), cocoa["production"]
+    assert np.allclose(cocoa["balance"], [2, 2, 2]), cocoa["balance"]
+    assert np.allclose(coffee["balance"], [10, 10, 10]), coffee["balance"]
+    assert np.allclose(tea["balance"], [-1, -1, -1]), tea["balance"]
+    assert not any(math.isfinite(bound) for bound in tea["balance_lo"] + tea["balance_hi"])
+    print("catalog forecasts: ok")
+
+
+def run(commodities, years):
+    names, yrs, production, consumption = synthetic_histories(commodities, years, np.random.default_rng(0))
+
+    start = time.perf_counter()
+    batched = forecast.forecast_balances(names, yrs, production, consumption)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = [
+        forecast.forecast_balances([name], yrs, production[i:i + 1], consumption[i:i + 1])
+        for i, name in enumerate(names)
+    ]
+    loop_s = time.perf_counter() - start
+    assert np.allclose(batched.balance, np.vstack([r.balance for r in looped]), equal_nan=True)
+
+    forecast.cached_forecast_balances(names, yrs, production, consumption)
+    start = time.perf_counter()
+    forecast.cached_forecast_balances(names, yrs, production, consumption)
+    cached_s = time.perf_counter() - start
+
+    print(f"{commodities} commodities x {years} years")
+    print(f"  batched fit:        {batch_s * 1e3:8.1f} ms")
+    print(f"  per-commodity loop: {loop_s * 1e3:8.1f} ms  ({loop_s / batch_s:.0f}x slower)")
+    print(f"  cached rerun:       {cached_s * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commodities", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+    check_catalog()
+    run(args.commodities, args.years)
@@ -0,0 +1,99 @@
+"""Latency of each page interaction: full-script rerun vs. fragment rerun.
+
+AppTest always reruns the whole script, which is what every interaction
+cost before the page was split into fragments. Each fragment body is timed
+as well; for a widget that lives inside a fragment, that body is all a
+real session reruns now.
+
+    python benchmarks/bench_interactions.py --runs 10
+"""
+import argparse
+import functools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rss_server import RSSServer  # noqa: E402
+
+SERVER = RSSServer().start()
+os.environ["NEWS_RSS_HOST"] = SERVER.url
+os.environ.setdefault("NEWS_STORE_PATH", os.path.join(tempfile.mkdtemp(), "news.sqlite3"))
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+FRAGMENT_TIMES = defaultdict(list)
+_fragment = st.fragment
+
+
+def timed_fragment(func=None, **kwargs):
+    if func is None:
+        return lambda f: timed_fragment(f, **kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kw)
+        finally:
+            FRAGMENT_TIMES[func.__name__].append(time.perf_counter() - start)
+
+    return _fragment(wrapper, **kwargs)
+
+
+st.fragment = timed_fragment
+
+# interaction -> (widget action, fragment that owns the widget or None)
+INTERACTIONS = {
+    "commodity switch": (lambda at, i: at.selectbox[0].select(["Cocoa", "Coffee"][i % 2]), None),
+    "language switch": (lambda at, i: at.sidebar.radio[0].set_value(["tr", "en"][i % 2]), None),
+    "region switch": (lambda at, i: _region(at, i), "news_section"),
+    "scenario stress": (lambda at, i: _stress(at, i), "market_balance_section"),
+}
+
+
+def _region(at, i):
+    # The radio's values are region codes; its options are display names.
+    return at.main.radio[0].set_value(["Turkey", "Global"][i % 2])
+
+
+def _stress(at, i):
+    if not at.slider:
+        at.toggle[0].set_value(True).run()
+    return at.slider[0].set_value([1.5, 2.0][i % 2])
+
+
+def run(app, runs):
+    at = AppTest.from_file(app, default_timeout=60).run()
+
+    print(f"{'interaction':<18} {'full rerun p50':>15} {'fragment p50':>13}")
+    results = {}
+    for name, (action, fragment) in INTERACTIONS.items():
+        full = []
+        FRAGMENT_TIMES.clear()
+        for i in range(runs):
+            action(at, i)
+            start = time.perf_counter()
+            at.run()
+            full.append(time.perf_counter() - start)
+        full_ms = statistics.median(full) * 1e3
+        frag_ms = statistics.median(FRAGMENT_TIMES[fragment]) * 1e3 if fragment else None
+        results[name] = {"full_rerun_ms": full_ms, "fragment_ms": frag_ms}
+        frag = f"{frag_ms:12.1f}" if frag_ms is not None else f"{'(full)':>12}"
+        print(f"{name:<18} {full_ms:14.1f} {frag}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run(os.path.abspath(args.app), args.runs)
+    SERVER.shutdown()
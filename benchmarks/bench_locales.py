@@ -0,0 +1,98 @@
+"""Locale catalog cost as languages are added.
+
+Adds synthetic locales (copies of the Turkish one with every string
+changed) next to the real ones and, for each language count, reports:
+
+  compile       one-off build of all locales
+  worker KB     memory a worker holds after serving pages in one language:
+                the locale index, that locale and its catalog lookups
+  eager KB      every language's strings held in memory at once, as the
+                per-language dicts and tables used to be
+  rerun us      per-rerun lookups (UI strings, sector table, fact sheet)
+                once warm
+
+    python benchmarks/bench_locales.py --languages 2 10 50 200
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog  # noqa: E402
+import locales  # noqa: E402
+import news  # noqa: E402
+
+
+def strings(obj, suffix):
+    if isinstance(obj, str):
+        return f"{obj} [{suffix}]"
+    if isinstance(obj, list):
+        return [strings(value, suffix) for value in obj]
+    return {key: strings(value, suffix) for key, value in obj.items()}
+
+
+def make_sources(count):
+    source_dir = tempfile.mkdtemp()
+    for name in os.listdir(locales.SOURCE_DIR):
+        shutil.copy(os.path.join(locales.SOURCE_DIR, name), source_dir)
+    with open(os.path.join(locales.SOURCE_DIR, "tr.json"), encoding="utf-8") as f:
+        template = json.load(f)
+    for n in range(count - len(os.listdir(source_dir))):
+        code = f"x{n:03d}"
+        with open(os.path.join(source_dir, f"{code}.json"), "w", encoding="utf-8") as f:
+            json.dump(strings(template, code), f, ensure_ascii=False)
+    return source_dir
+
+
+def serve(cat, lang):
+    cat.locales.names()
+    cat.locales.load(lang).ui["title"]
+    for commodity in news.PRESETS:
+        cat.sector_insights(commodity, lang)
+        cat.facts(commodity, lang)
+
+
+def run(counts, number):
+    dataset = catalog.CommodityCatalog().dataset
+    # One-off costs (pandas internals, tables opened) out of the first row.
+    serve(catalog.CommodityCatalog(dataset), "tr")
+    print(f"{'languages':>9} {'compile s':>10} {'worker KB':>10} {'eager KB':>10} {'rerun us':>9}")
+    for count in counts:
+        source_dir, out_dir = make_sources(count), tempfile.mkdtemp()
+        start = time.perf_counter()
+        locales.ensure_compiled(source_dir, out_dir)
+        compile_s = time.perf_counter() - start
+
+        tracemalloc.start()
+        cat = catalog.CommodityCatalog(dataset, locale_catalog=locales.LocaleCatalog(source_dir, out_dir))
+        serve(cat, "tr")
+        worker_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        eager = {}
+        for name in os.listdir(source_dir):
+            with open(os.path.join(source_dir, name), encoding="utf-8") as f:
+                eager[name] = json.load(f)
+        eager_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+
+        rerun = min(timeit.repeat(lambda: serve(cat, "tr"), number=number, repeat=3)) / number * 1e6
+        print(f"{count:>9} {compile_s:10.3f} {worker_kb:10.0f} {eager_kb:10.0f} {rerun:9.1f}")
+        shutil.rmtree(source_dir)
+        shutil.rmtree(out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", type=int, nargs="+", default=[2, 10, 50, 200])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    run(args.languages, args.number)
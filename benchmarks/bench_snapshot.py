@@ -0,0 +1,51 @@
+"""Static snapshot builds: full, no-op and after one feed changes.
+
+Builds every preset combination against the local fixture RSS server with
+an empty news store, then again with nothing changed, then after one feed
+gains newer articles and its stored copy expires. Only snapshots whose
+visible news changed are rebuilt: here the feed's two languages.
+
+    python benchmarks/bench_snapshot.py --workers 1 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import news  # noqa: E402
+import snapshot  # noqa: E402
+from feed_store import FeedStore  # noqa: E402
+from news_archive import NewsArchive  # noqa: E402
+from rss_server import RSSServer, build_feed  # noqa: E402
+
+
+def run(workers):
+    print(f"{'build':<24} {'workers':>7} {'built':>6} {'skipped':>8} {'seconds':>8}")
+    for count in workers:
+        server = RSSServer(duplicate_every=4).start()
+        news.NEWS_HOST = server.url
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, "news.sqlite3")
+        store, archive = FeedStore(path), NewsArchive(path)
+        out = os.path.join(tmp, "snapshots")
+
+        def report(label, stats):
+            print(f"{label:<24} {count:>7} {stats.built:>6} {stats.skipped:>8} {stats.seconds:8.2f}")
+
+        report("full", snapshot.build_all(out, count, store=store, archive=archive))
+        report("nothing changed", snapshot.build_all(out, count, store=store, archive=archive))
+        query = "Cocoa commodity market"
+        server.feed_for(query)
+        # Five more articles, all newer than those already shown.
+        server._feeds[query] = build_feed(query, items=45, now=1_800_000_000)
+        store.touch(news.feed_url("Cocoa", "Global"), fetched_at=1)
+        report("one feed changed", snapshot.build_all(out, count, store=store, archive=archive))
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    run(parser.parse_args().workers)
@@ -0,0 +1,99 @@
+"""Feed refreshes with bad upstreams, with and without host isolation.
+
+Every preset is fetched from three sources on one bounded thread pool: the
+local fixture RSS server, a source whose host accepts connections but never
+answers, and one that answers but trickles the body out a few bytes at a
+time. Without isolation (no per-host connection cap, no circuit breaker)
+the bad hosts hold pool threads for a full timeout on every refresh, and
+the healthy feeds queue behind them. With the default HostPool limits they
+get a few requests, are cut off, and the next rounds fail them at once.
+
+Also reported: requests to the healthy host vs. connections opened for them.
+Exits non-zero if any single fetch outlasted its timeout: a trickling body
+must not keep a request past it.
+
+    python benchmarks/bench_sources.py --timeout 2 --rounds 3
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import news  # noqa: E402
+from http_pool import HostPool  # noqa: E402
+from rss_server import RSSServer  # noqa: E402
+
+UNLIMITED = dict(max_connections=1024, rate=1e9, burst=10**9, failure_threshold=None)
+BAD = ("Stalled", "Dripping")
+# Allowed overrun of a fetch past its timeout (parsing, thread wake-ups).
+SLACK = 0.5
+
+
+def run_round(pairs, timeout, workers):
+    done, durations = {}, []
+    start = time.perf_counter()
+
+    def fetch(query, region):
+        called = time.perf_counter()
+        try:
+            return news.fetch_feed(query, region, timeout=timeout)
+        finally:
+            done[(query, region)] = time.perf_counter() - start
+            durations.append(time.perf_counter() - called)
+
+    results = news.fetch_news_batch(pairs, fetch=fetch, max_workers=workers)
+    elapsed = time.perf_counter() - start
+    healthy = max(seconds for (_, region), seconds in done.items() if region == "Global")
+    outcomes = {bad: Counter("ok" if isinstance(result, list) else type(result).__name__
+                             for (_, region), result in results.items() if region == bad) for bad in BAD}
+    return elapsed, healthy, outcomes, max(durations)
+
+
+def run(timeout, rounds, workers, latency, drip):
+    server = RSSServer(latency=latency).start()
+    dripping = RSSServer(drip=drip).start()
+    news.NEWS_HOST = server.url
+    stalled = socket.socket()
+    stalled.bind(("127.0.0.1", 0))
+    stalled.listen(1024)
+    news.register_source("Stalled", "{host}/rss?q={term}", host=f"http://127.0.0.1:{stalled.getsockname()[1]}")
+    news.register_source("Dripping", "{host}/rss?q={term}", host=dripping.url)
+    pairs = [(query, region) for query in news.PRESETS for region in ("Global",) + BAD]
+
+    print(f"{'hosts':<10} {'round':>5} {'batch s':>8} {'healthy s':>10} {'longest s':>10}  bad sources")
+    overran = []
+    for label, limits in (("shared", UNLIMITED), ("isolated", {})):
+        news.HTTP = HostPool(**limits)
+        for n in range(rounds):
+            elapsed, healthy, outcomes, longest = run_round(pairs, timeout, workers)
+            print(f"{label:<10} {n + 1:>5} {elapsed:8.2f} {healthy:10.2f} {longest:10.2f}  " + "; ".join(
+                f"{bad}: " + ", ".join(f"{name} {count}" for name, count in sorted(counts.items()))
+                for bad, counts in outcomes.items()
+            ))
+            if longest > timeout + SLACK:
+                overran.append(f"{label} round {n + 1}: {longest:.2f}s")
+        status = {row.host: row for row in news.HTTP.status()}[server.url.split("//")[1]]
+        print(f"{label:<10} healthy host: {status.requests} requests on "
+              f"{status.requests - status.reused} connections")
+    for bad in BAD:
+        del news.SOURCES[bad]
+        news.REGIONS.remove(bad)
+    server.shutdown()
+    dripping.shutdown()
+    if overran:
+        sys.exit(f"fetches outlasted the {timeout}s timeout: " + "; ".join(overran))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeout", type=float, default=2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=news.MAX_WORKERS)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--drip", type=float, default=0.05, help="seconds between body pieces of the dripping source")
+    args = parser.parse_args()
+    run(args.timeout, args.rounds, args.workers, args.latency, args.drip)
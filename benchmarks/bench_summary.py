@@ -0,0 +1,71 @@
+"""Summary cleaning: BeautifulSoup get_text() vs. the streaming SummaryCleaner.
+
+Checks that both produce identical output on the fixture corpus, then times
+them on a batch built from it.
+
+    python benchmarks/bench_summary.py
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from summary_cleaner import clean_summaries  # noqa: E402
+
+CORPUS = os.path.join(ROOT, "benchmarks", "fixtures", "summaries.json")
+
+
+def bs4_clean(raw_summary):
+    # The pre-existing fetch_news cleaning, kept verbatim as the reference.
+    clean_summary = ""
+    if raw_summary:
+        try:
+            soup = BeautifulSoup(raw_summary, "html.parser")
+            clean_summary = soup.get_text()
+            if len(clean_summary) > 200:
+                clean_summary = clean_summary[:200] + "..."
+        except Exception:
+            clean_summary = raw_summary[:200]
+    return clean_summary
+
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check(corpus):
+    expected = [bs4_clean(raw) for raw in corpus]
+    actual = clean_summaries(corpus)
+    mismatches = [(raw, e, a) for raw, e, a in zip(corpus, expected, actual) if e != a]
+    for raw, e, a in mismatches:
+        print(f"MISMATCH\n  raw:      {raw!r}\n  bs4:      {e!r}\n  streamed: {a!r}")
+    return not mismatches
+
+
+def run(repeat):
+    corpus = load_corpus()
+    if not check(corpus):
+        sys.exit(1)
+    print(f"output identical on {len(corpus)} fixture summaries")
+
+    batch = corpus * 10
+    bs4_time = min(timeit.repeat(lambda: [bs4_clean(raw) for raw in batch], number=1, repeat=repeat))
+    fast_time = min(timeit.repeat(lambda: clean_summaries(batch), number=1, repeat=repeat))
+    per = 1e6 / len(batch)
+    print(f"BeautifulSoup:  {bs4_time * per:8.1f} us/summary")
+    print(f"SummaryCleaner: {fast_time * per:8.1f} us/summary")
+    print(f"speedup: {bs4_time / fast_time:.1f}x")
+    return {"bs4_us": bs4_time * per, "streaming_us": fast_time * per}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    run(parser.parse_args().repeat)
@@ -0,0 +1,154 @@
+"""Local stand-in for the Google News RSS endpoint used by the benchmarks.
+
+Serves a deterministic feed per query string with an optional artificial
+latency, so fetch paths can be timed without touching the network. With
+``drip`` the body trickles out in small pieces, like a server that keeps
+the connection busy without ever finishing.
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+ITEM_TEMPLATE = """
+<item>
+<title>{title}</title>
+<link>https://example.com/{slug}/{n}</link>
+<guid isPermaLink="false">{slug}-{n}</guid>
+<pubDate>{pub}</pubDate>
+<description>{summary}</description>
+<source url="https://example.com">{source}</source>
+</item>"""
+
+SOURCES = ["Reuters", "Bloomberg", "Anadolu Ajansı", "AgriCensus", "Financial Times"]
+SYLLABLES = [c + v for c in "bcdfghklmnprstvyz" for v in "aeiou"]
+DRIP_BYTES = 64
+
+
+def vocabulary(size=20_000, seed=3):
+    # Pronounceable pseudo-words. Headline vocabularies run to tens of
+    # thousands of words; a small one makes unrelated titles overlap.
+    rng = random.Random(seed)
+    return ["".join(rng.choices(SYLLABLES, k=rng.randint(2, 3))) for _ in range(size)]
+
+
+WORDS = vocabulary()
+
+
+def headline(query, n):
+    rng = random.Random(f"{query}/{n}")
+    return f"{query} " + " ".join(rng.choices(WORDS, k=10))
+
+
+def build_feed(query, items=40, now=None, duplicate_every=0):
+    """Deterministic feed for ``query``. With ``duplicate_every`` k > 0, every
+    k-th item is another outlet's copy of the item before it (same story,
+    lightly reworded), as happens with wire stories."""
+    now = now or 1_700_000_000
+    slug = hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+    parts = []
+    for n in range(items):
+        source = SOURCES[n % len(SOURCES)]
+        story = n - 1 if duplicate_every and n and n % duplicate_every == 0 else n
+        title = headline(query, story) + (" - update" if story != n else "")
+        body = " ".join(random.Random(f"{query}/{story}/body").choices(WORDS, k=12))
+        summary_html = (
+            f'<a href="https://example.com/{slug}/{n}" target="_blank">{escape(title)}</a>'
+            f"&nbsp;&nbsp;<font color=\"#6f6f6f\">{escape(source)}</font>"
+            f"<p>Market report on {escape(query)} &amp; related futures: {body}.</p>"
+        )
+        parts.append(ITEM_TEMPLATE.format(
+            title=escape(title),
+            slug=slug,
+            n=n,
+            pub=formatdate(now - n * 3600, usegmt=True),
+            summary=escape(summary_html),
+            source=escape(source),
+        ))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel><title>"{}" - Google News</title>'
+        "<link>https://news.google.com</link><description>Google News</description>{}"
+        "</channel></rss>"
+    ).format(escape(query), "".join(parts)).encode("utf-8")
+
+
+class RSSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        body = self.server.feed_for(query)
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.server.hits += 1
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not self.server.drip:
+            self.wfile.write(body)
+            return
+        try:
+            for start in range(0, len(body), DRIP_BYTES):
+                self.wfile.write(body[start:start + DRIP_BYTES])
+                self.wfile.flush()
+                time.sleep(self.server.drip)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class RSSServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, items=40, duplicate_every=0, drip=0.0):
+        super().__init__(("127.0.0.1", port), RSSHandler)
+        self.latency = latency
+        self.drip = drip
+        self.items = items
+        self.duplicate_every = duplicate_every
+        self.hits = 0
+        self.not_modified = 0
+        self._feeds = {}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def feed_for(self, query):
+        if query not in self._feeds:
+            self._feeds[query] = build_feed(query, self.items, duplicate_every=self.duplicate_every)
+        return self._feeds[query]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="rss-server", daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to every response")
+    parser.add_argument("--items", type=int, default=40)
+    args = parser.parse_args()
+    server = RSSServer(args.port, args.latency, args.items)
+    print(f"Serving fixture RSS on {server.url}")
+    server.serve_forever()
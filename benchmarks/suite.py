@@ -0,0 +1,252 @@
+"""Headless benchmark suite for the dashboard.
+
+Drives app.py through Streamlit's AppTest with news served by the local
+fixture RSS server, and reports p50/p95 latency for:
+
+  page      cold render (fresh process, empty news store), warm render,
+            commodity switch, language switch, region switch and custom
+            commodity entry
+  micro     data-engine lookups, map clustering, forecasting, scenarios,
+            summary cleaning, feed ingestion and news grid rendering
+
+Results are written as JSON; pass an earlier result to --compare to print
+the change per case.
+
+    python benchmarks/suite.py --out before.json
+    python benchmarks/suite.py --out after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from rss_server import RSSServer, build_feed  # noqa: E402
+
+CUSTOM_COMMODITIES = ["Rice", "Barley", "Tea", "Rubber", "Oats", "Vanilla", "Saffron", "Lentils", "Olives", "Walnuts"]
+
+
+def summarize(timings):
+    """p50/p95/min/max in milliseconds of a list of durations in seconds."""
+    ms = sorted(t * 1e3 for t in timings)
+    p95 = statistics.quantiles(ms, n=20, method="inclusive")[-1] if len(ms) > 1 else ms[0]
+    return {"p50_ms": statistics.median(ms), "p95_ms": p95, "min_ms": ms[0], "max_ms": ms[-1], "runs": len(ms)}
+
+
+def timed(fn, runs):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def serve_fixture_news(latency):
+    server = RSSServer(latency=latency).start()
+    os.environ["NEWS_RSS_HOST"] = server.url
+    os.environ["NEWS_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "news.sqlite3")
+    return server
+
+
+# --- PAGE ---
+def cold_render(app, runs, latency):
+    """First render in a fresh interpreter with an empty news store."""
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, __file__, "--cold-child", "--app", app, "--latency", str(latency)],
+            check=True, capture_output=True, text=True,
+        )
+        timings.append(json.loads(out.stdout.strip().splitlines()[-1])["seconds"])
+    return summarize(timings)
+
+
+def cold_child(app, latency):
+    server = serve_fixture_news(latency)
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    AppTest.from_file(app, default_timeout=120).run()
+    print(json.dumps({"seconds": time.perf_counter() - start}))
+    server.shutdown()
+
+
+def settle(server, feeds, timeout=30):
+    # The app prefetches every preset feed in the background at startup;
+    # let that finish so it does not land in the timed reruns.
+    deadline = time.monotonic() + timeout
+    while server.hits < feeds and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.2)
+
+
+def page_benchmarks(app, runs, server):
+    from streamlit.testing.v1 import AppTest
+
+    import locales
+    import news
+
+    at = AppTest.from_file(app, default_timeout=60).run()
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].value}")
+    settle(server, len(news.preset_pairs()))
+
+    def select(i):
+        at.selectbox[0].select(news.PRESETS[(i + 1) % len(news.PRESETS)]).run()
+
+    def language(i):
+        # The radio's values are locale codes; its options are display names.
+        codes = locales.languages()
+        at.sidebar.radio[0].set_value(codes[(i + 1) % len(codes)]).run()
+
+    def region(i):
+        at.main.radio[0].set_value(news.REGIONS[(i + 1) % len(news.REGIONS)]).run()
+
+    def custom(i):
+        at.text_input[0].set_value(CUSTOM_COMMODITIES[i % len(CUSTOM_COMMODITIES)]).run()
+
+    results = {
+        "warm_render": timed(lambda i: at.run(), runs),
+        "commodity_switch": timed(select, runs),
+        "language_switch": timed(language, runs),
+        "region_switch": timed(region, runs),
+    }
+    at.selectbox[0].select(at.selectbox[0].options[-1]).run()
+    results["custom_commodity"] = timed(custom, runs)
+    return results
+
+
+# --- MICRO ---
+def micro(fn, runs, number):
+    """Per-call time of ``fn`` over ``runs`` batches of ``number`` calls."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    result = summarize(timings)
+    return {key.replace("_ms", "_us"): value * 1e3 if key.endswith("_ms") else value for key, value in result.items()}
+
+
+def micro_benchmarks(runs):
+    import feedparser
+
+    import forecast
+    import news
+    import news_grid
+    import scenarios
+    from catalog import CommodityCatalog
+    from figures import FigureCache, supply_map_figure
+    from summary_cleaner import clean_summaries
+
+    cat = CommodityCatalog()
+    commodities = list(news.PRESETS)
+    index = cat.supply_index("Hazelnuts")
+    figures = FigureCache()
+    figures.get_or_build("Hazelnuts", lambda: supply_map_figure(index.clusters(zoom=0.5), 0.5))
+    market = cat.market_balance("Hazelnuts")
+    zones = cat.supply_map("Hazelnuts")
+    pairs = tuple(zip(zones["Output"], zones["Risk"]))
+    history = [[100 + 3 * t + (t % 4) for t in range(15)] for _ in range(2 * len(commodities))]
+    with open(os.path.join(HERE, "fixtures", "summaries.json"), encoding="utf-8") as f:
+        summaries = json.load(f)
+    entries = feedparser.parse(build_feed("Hazelnuts")).entries
+    articles = news.ingest_entries(feedparser.parse(build_feed("Cocoa", items=news.MAX_ITEMS)).entries, limit=news.MAX_ITEMS)[0]
+
+    cases = {
+        "catalog_lookups": (lambda: [
+            (cat.supply_map(c), cat.market_balance(c), cat.sector_insights(c, "en"), cat.facts(c, "en"))
+            for c in commodities
+        ], 100),
+        "map_clusters": (lambda: index.clusters(zoom=0.5), 100),
+        "figure_cache_hit": (lambda: figures.get_or_build("Hazelnuts", None), 1000),
+        "forecast_batch": (lambda: forecast.forecast_balances(
+            commodities, list(range(2010, 2025)), history[:len(commodities)], history[len(commodities):]
+        ), 20),
+        "scenario_20k_draws": (lambda: scenarios.simulate.__wrapped__(market[0], market[1], pairs), 5),
+        "summary_cleaning": (lambda: clean_summaries(summaries), 20),
+        "feed_ingest": (lambda: news.ingest_entries(entries), 10),
+        "news_grid_page": (lambda: news_grid.render_page(articles, 5), 1000),
+    }
+    return {name: micro(fn, runs, number) for name, (fn, number) in cases.items()}
+
+
+# --- REPORT ---
+def metadata():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        rev = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_rev": rev or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def print_table(title, results, unit, baseline=None):
+    if not results:
+        return
+    print(f"\n{title}")
+    print(f"  {'case':<22} {'p50':>10} {'p95':>10}" + (f" {'p50 vs base':>12}" if baseline else ""))
+    for name, row in results.items():
+        line = f"  {name:<22} {row[f'p50_{unit}']:8.2f}{unit} {row[f'p95_{unit}']:8.2f}{unit}"
+        base = (baseline or {}).get(name)
+        if base:
+            line += f" {(row[f'p50_{unit}'] / base[f'p50_{unit}'] - 1) * 100:+11.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per page and micro case")
+    parser.add_argument("--cold-runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fixture RSS response")
+    parser.add_argument("--skip", action="append", default=[], choices=["cold", "page", "micro"])
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    parser.add_argument("--cold-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    app = os.path.abspath(args.app)
+
+    if args.cold_child:
+        cold_child(app, args.latency)
+        return
+
+    server = serve_fixture_news(args.latency)
+    results = {"meta": dict(metadata(), runs=args.runs, latency=args.latency), "page": {}, "micro": {}}
+    if "cold" not in args.skip:
+        results["page"]["cold_render"] = cold_render(app, args.cold_runs, args.latency)
+    if "page" not in args.skip:
+        results["page"].update(page_benchmarks(app, args.runs, server))
+    if "micro" not in args.skip:
+        results["micro"] = micro_benchmarks(args.runs)
+    server.shutdown()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table("page (AppTest rerun)", results["page"], "ms", baseline.get("page"))
+    print_table("micro (per call)", results["micro"], "us", baseline.get("micro"))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import locales
+from dataset import open_dataset
+from forecast import cached_forecast_balances
+from spatial import SpatialIndex
+
+# --- FALLBACKS ---
+# Sector and status ids, named by the locale; fact sheets fall back to the
+# locale's default_facts.
+DEFAULT_SECTORS = [{"sector": "general_market", "Share": 100, "status": "normal"}]
+
+# Per-lookup LRU size; bounds memory per worker independently of the dataset.
+CACHE_SIZE = 256
+
+
+# --- CATALOG ---
+def _number(value):
+    # Whole figures (e.g. Corn 1222) keep displaying without a trailing ".0".
+    return int(value) if value.is_integer() else value
+
+
+class CommodityCatalog:
+    """Read-only view of the columnar commodity dataset.
+
+    Rows are sliced out of the memory-mapped tables by key on first use and
+    the resulting DataFrames are kept in bounded LRU caches, so memory per
+    worker depends on the cache size rather than the dataset size. The
+    objects handed out are shared by all sessions of the process and must
+    be treated as read-only.
+
+    Names of sectors and statuses, and the fact sheets, come from
+    ``locale_catalog`` (a LocaleCatalog, by default the app's).
+    """
+
+    def __init__(self, dataset=None, cache_size=CACHE_SIZE, locale_catalog=None):
+        self.dataset = dataset or open_dataset()
+        self.locales = locale_catalog or locales.CATALOG
+        self.version = self.dataset.version
+        self._no_supply = pd.DataFrame([])
+        self._supply_map = lru_cache(maxsize=cache_size)(self._load_supply_map)
+        self._supply_index = lru_cache(maxsize=cache_size)(self._load_supply_index)
+        self._market_balance = lru_cache(maxsize=cache_size)(self._load_market_balance)
+        self._sector_insights = lru_cache(maxsize=cache_size)(self._load_sector_insights)
+        self._forecasts = lru_cache(maxsize=1)(self._load_forecasts)
+
+    # --- LOADERS ---
+    def _load_supply_map(self, commodity):
+        rows = self.dataset.table("supply_zones").rows(commodity)
+        return self._no_supply if rows is None else rows.to_pandas()
+
+    def _load_supply_index(self, commodity):
+        return SpatialIndex(self.supply_map(commodity))
+
+    def _load_market_balance(self, commodity):
+        rows = self.dataset.table("market_balance").rows(commodity)
+        if rows is None:
+            return None
+        row = rows.to_pylist()[0]
+        return (_number(row["production"]), _number(row["consumption"]), row["unit"])
+
+    def _load_sector_insights(self, commodity, lang):
+        rows = self.dataset.table("sector_insights").rows(commodity)
+        rows = DEFAULT_SECTORS if rows is None else rows.to_pylist()
+        locale = self.locales.load(lang)
+        return pd.DataFrame({
+            "Sector": [locale.sectors.get(row["sector"], row["sector"]) for row in rows],
+            "Share": [row["Share"] for row in rows],
+            "Status": [locale.statuses.get(row["status"], row["status"]) for row in rows],
+        })
+
+    def balance_histories(self):
+        """All balance histories as (commodities, years, production, consumption).
+
+        The matrices are commodities x years over the union of years, NaN
+        where a commodity has no figure; None when the dataset has no history.
+        """
+        table = self.dataset.table("balance_history").read_all()
+        if table.num_rows == 0:
+            return None
+        names, row = np.unique(table.column("commodity").to_numpy(zero_copy_only=False), return_inverse=True)
+        year = table.column("year").to_numpy()
+        years = np.arange(year.min(), year.max() + 1)
+        production = np.full((len(names), len(years)), np.nan)
+        consumption = np.full_like(production, np.nan)
+        production[row, year - years[0]] = table.column("production").to_numpy()
+        consumption[row, year - years[0]] = table.column("consumption").to_numpy()
+        return list(names), years, production, consumption
+
+    def _load_forecasts(self):
+        histories = self.balance_histories()
+        if histories is None:
+            return None, {}
+        result = cached_forecast_balances(*histories)
+        return result, {name: i for i, name in enumerate(result.commodities)}
+
+    # --- LOOKUPS ---
+    def supply_map(self, commodity):
+        return self._supply_map(commodity)
+
+    def supply_index(self, commodity):
+        return self._supply_index(commodity)
+
+    def market_balance(self, commodity):
+        return self._market_balance(commodity)
+
+    def sector_insights(self, commodity, lang='en'):
+        return self._sector_insights(commodity, self.locales.resolve(lang))
+
+    def facts(self, commodity, lang='en'):
+        locale = self.locales.load(lang)
+        return locale.facts.get(commodity, locale.default_facts)
+
+    def cache_info(self):
+        """functools CacheInfo of every lookup cache, by name."""
+        caches = {
+            "supply_map": self._supply_map, "supply_index": self._supply_index,
+            "market_balance": self._market_balance, "sector_insights": self._sector_insights,
+        }
+        return {name: cached.cache_info() for name, cached in caches.items()}
+
+    def balance_forecast(self, commodity):
+        """Forecast production, consumption and balance with 80% intervals, or None."""
+        result, index = self._forecasts()
+        i = index.get(commodity)
+        if i is None:
+            return None
+        outlook = {field: getattr(result, field)[i].tolist() for field in result._fields[2:-1]}
+        outlook["years"] = result.years
+        outlook["models"] = result.models[i]
+        return outlook
@@ -0,0 +1,191 @@
+"""Columnar commodity dataset.
+
+Each table is an uncompressed Arrow IPC file sorted by its key columns, next
+to a small index file mapping every key to its row range. Tables are opened
+through a memory map, so a worker only pages in the rows it slices and the
+resident set stays flat as the dataset grows.
+
+The dataset is built from a seed document shaped like data/seed.json:
+
+    {"supply_zones":    {commodity: [{"Region", "Lat", "Lon", "Output", "Risk"}, ...]},
+     "market_balance":  {commodity: {"production", "consumption", "unit"}},
+     "sector_insights": {commodity: [{"sector", "Share", "status"}, ...]},
+     "balance_history": {commodity: [{"year", "production", "consumption"}, ...]}}
+
+Sectors and statuses are ids; their names, and the fact sheets, are strings
+and live in the locale catalog (see locales.py).
+
+"balance_history" is optional; "year" is the first calendar year of the
+marketing year (2024 for 2024/25).
+"""
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.ipc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SEED_PATH = os.path.join(ROOT, "data", "seed.json")
+DEFAULT_DIR = os.environ.get("COMMODITY_DATASET_DIR", os.path.join(ROOT, ".cache", "dataset"))
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 3
+
+SCHEMAS = {
+    "supply_zones": pa.schema([
+        ("commodity", pa.string()), ("Region", pa.string()), ("Lat", pa.float64()),
+        ("Lon", pa.float64()), ("Output", pa.string()), ("Risk", pa.string()),
+    ]),
+    "market_balance": pa.schema([
+        ("commodity", pa.string()), ("production", pa.float64()),
+        ("consumption", pa.float64()), ("unit", pa.string()),
+    ]),
+    "sector_insights": pa.schema([
+        ("commodity", pa.string()), ("sector", pa.string()), ("Share", pa.int64()), ("status", pa.string()),
+    ]),
+    "balance_history": pa.schema([
+        ("commodity", pa.string()), ("year", pa.int64()),
+        ("production", pa.float64()), ("consumption", pa.float64()),
+    ]),
+}
+
+KEYS = {
+    "supply_zones": ("commodity",),
+    "market_balance": ("commodity",),
+    "sector_insights": ("commodity",),
+    "balance_history": ("commodity",),
+}
+
+
+# --- BUILD ---
+def seed_rows(seed):
+    """Flatten a seed document into per-table row dicts."""
+    rows = {name: [] for name in SCHEMAS}
+    for commodity, zones in seed.get("supply_zones", {}).items():
+        rows["supply_zones"] += [dict(zone, commodity=commodity) for zone in zones]
+    for commodity, balance in seed.get("market_balance", {}).items():
+        rows["market_balance"].append(dict(balance, commodity=commodity))
+    for commodity, sectors in seed.get("sector_insights", {}).items():
+        rows["sector_insights"] += [dict(sector, commodity=commodity) for sector in sectors]
+    for commodity, history in seed.get("balance_history", {}).items():
+        rows["balance_history"] += [dict(point, commodity=commodity) for point in sorted(history, key=lambda p: p["year"])]
+    return rows
+
+
+def _key_index(table, keys):
+    columns = [table.column(key).to_pylist() for key in keys]
+    index = {key: [] for key in keys}
+    index.update(start=[], stop=[])
+    previous = None
+    for row, key in enumerate(zip(*columns)):
+        if key != previous:
+            if previous is not None:
+                index["stop"].append(row)
+            for name, value in zip(keys, key):
+                index[name].append(value)
+            index["start"].append(row)
+            previous = key
+    if previous is not None:
+        index["stop"].append(table.num_rows)
+    return pa.table(index, schema=pa.schema(
+        [(key, pa.string()) for key in keys] + [("start", pa.int64()), ("stop", pa.int64())]
+    ))
+
+
+def _write_ipc(table, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def write_dataset(seed, out_dir, version):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, rows in seed_rows(seed).items():
+        keys = KEYS[name]
+        # Stable sort keeps the seed order of rows within a key.
+        rows.sort(key=lambda row: tuple(row[key] for key in keys))
+        table = pa.Table.from_pylist(rows, schema=SCHEMAS[name])
+        _write_ipc(table, os.path.join(out_dir, f"{name}.arrow"))
+        _write_ipc(_key_index(table, keys), os.path.join(out_dir, f"{name}.index.arrow"))
+
+    manifest = {"format": FORMAT_VERSION, "version": version, "tables": sorted(SCHEMAS)}
+    tmp = os.path.join(out_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+
+
+def seed_version(seed_path=SEED_PATH):
+    with open(seed_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_dataset(directory=DEFAULT_DIR, seed_path=SEED_PATH):
+    """Build the dataset from the seed unless an up-to-date build exists."""
+    version = seed_version(seed_path)
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get("format") != FORMAT_VERSION or manifest.get("version") != version:
+        with open(seed_path, encoding="utf-8") as f:
+            write_dataset(json.load(f), directory, version)
+    return directory
+
+
+# --- READ ---
+class ColumnarTable:
+    """One memory-mapped table with an in-memory key -> row range index."""
+
+    def __init__(self, path, keys):
+        self.keys = keys
+        self._table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        index = pa.ipc.open_file(pa.memory_map(path[:-len(".arrow")] + ".index.arrow")).read_all()
+        bounds = zip(index.column("start").to_pylist(), index.column("stop").to_pylist())
+        key_columns = [index.column(key).to_pylist() for key in keys]
+        self._index = dict(zip(zip(*key_columns), bounds))
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def read_all(self):
+        return self._table
+
+    def rows(self, *key):
+        """Rows for one key, without the key columns, or None if the key is absent."""
+        bounds = self._index.get(key)
+        if bounds is None:
+            return None
+        start, stop = bounds
+        return self._table.slice(start, stop - start).drop_columns(list(self.keys))
+
+
+class ColumnarDataset:
+    """The commodity dataset in a directory, opening each table on first use."""
+
+    def __init__(self, directory=DEFAULT_DIR):
+        manifest = read_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"No commodity dataset in {directory}")
+        self.directory = directory
+        self.version = manifest["version"]
+        self._tables = {}
+
+    def table(self, name):
+        if name not in self._tables:
+            self._tables[name] = ColumnarTable(os.path.join(self.directory, f"{name}.arrow"), KEYS[name])
+        return self._tables[name]
+
+
+def open_dataset(directory=DEFAULT_DIR, seed_path=SEED_PATH):
+    return ColumnarDataset(ensure_dataset(directory, seed_path))
@@ -0,0 +1,178 @@
+"""Near-duplicate detection for news items with MinHash and LSH.
+
+Each item's title and cleaned summary are folded to lower-case words and cut
+into overlapping character shingles. A MinHash signature of NUM_PERM values
+estimates the Jaccard similarity of two shingle sets. Signatures are split
+into BANDS bands; items sharing any band land in the same bucket and become
+candidates, so a lookup only compares an item against its few bucket mates
+instead of the whole index. Candidates whose estimated similarity reaches
+THRESHOLD are merged into one story (union-find), across feeds and regions.
+"""
+import threading
+import zlib
+
+import numpy as np
+
+import news
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# With 16 bands of 4 rows, pairs at Jaccard 0.5 collide in some band ~65% of
+# the time, pairs at 0.7 ~99%.
+THRESHOLD = 0.5
+# Newest keys kept per bucket. Real buckets hold a handful of items; the cap
+# only bounds degenerate ones (e.g. many empty items) so lookups stay cheap.
+BUCKET_CAP = 32
+# Items indexed before the index starts over (~3.5 KB each). The preset
+# feeds hold about 4000 items, so a reset only loses grouping across feeds
+# that are no longer shown; collapse() regroups whatever it is given.
+MAX_ITEMS = 10_000
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)[:, None]
+
+def item_text(item):
+    # Google News summaries repeat the title and append the outlet's name;
+    # drop the name so the same story from two outlets compares equal.
+    summary = item.get('summary') or ""
+    source = item.get('source') or ""
+    if source and summary.endswith(source):
+        summary = summary[:-len(source)]
+    return news.fold_query(f"{item.get('title') or ''} {summary}")
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint64 values) of a normalized text."""
+    hashed = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64)
+    hashed %= _PRIME
+    return ((_A * hashed[None, :] + _B) % _PRIME).min(axis=1)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+class DedupIndex:
+    """LSH index over every news item seen, grouping near-duplicates into stories.
+
+    Items are keyed by GUID (or link). Adding an item costs one signature
+    and BANDS bucket lookups whatever the index size. Once ``max_items`` are
+    indexed it is cleared and starts over. Thread-safe.
+    """
+
+    def __init__(self, threshold=THRESHOLD, max_items=MAX_ITEMS):
+        self.threshold = threshold
+        self.max_items = max_items
+        self.resets = 0
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._buckets = [dict() for _ in range(BANDS)]
+        self._signatures = {}
+        self._parent = {}
+        self._sources = {}
+
+    def _reserve(self, count):
+        # Caller holds the lock.
+        if self._signatures and len(self._signatures) + count > self.max_items:
+            self._clear()
+            self.resets += 1
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def _find(self, key):
+        parent = self._parent
+        root = key
+        while parent[root] != root:
+            root = parent[root]
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        if len(self._sources[root_a]) < len(self._sources[root_b]):
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._sources[root_a].update(self._sources.pop(root_b))
+
+    def add(self, item):
+        """Index one item; returns the key of its story (the group representative)."""
+        key = item.get('guid') or item['link']
+        with self._lock:
+            if key in self._signatures:
+                return self._find(key)
+        sig = signature(item_text(item))
+        bands = [sig[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+        with self._lock:
+            if key in self._signatures:
+                return self._find(key)
+            self._reserve(1)
+            self._signatures[key] = sig
+            self._parent[key] = key
+            self._sources[key] = {item.get('source') or "": None}
+            candidates = set()
+            for band, bucket_key in zip(self._buckets, bands):
+                members = band.setdefault(bucket_key, [])
+                candidates.update(members)
+                members.append(key)
+                if len(members) > BUCKET_CAP:
+                    del members[0]
+            if candidates:
+                candidates = list(candidates)
+                matches = (np.array([self._signatures[other] for other in candidates]) == sig).mean(axis=1)
+                for other, score in zip(candidates, matches):
+                    if score >= self.threshold:
+                        self._union(key, other)
+            return self._find(key)
+
+    def story(self, key):
+        with self._lock:
+            return self._find(key) if key in self._parent else key
+
+    def sources(self, key):
+        """Every outlet that carried the story ``key`` belongs to, in first-seen order."""
+        with self._lock:
+            if key not in self._parent:
+                return []
+            return [source for source in self._sources[self._find(key)] if source]
+
+    def collapse(self, items):
+        """Merge near-duplicates in ``items`` (newest first) into one card per story.
+
+        The first item of each story is kept; its 'sources' lists every
+        outlet that carried the story in any indexed feed, and 'duplicates'
+        counts the items folded into it here.
+        """
+        with self._lock:
+            self._reserve(sum(1 for item in items if (item.get('guid') or item['link']) not in self._signatures))
+        for item in items:
+            self.add(item)
+        # Grouped only after every item is in: a later item can join two stories.
+        cards = {}
+        for item in items:
+            story = self.story(item.get('guid') or item['link'])
+            card = cards.get(story)
+            if card is None:
+                cards[story] = dict(item, sources=self.sources(story), duplicates=0)
+            else:
+                card['duplicates'] += 1
+        return list(cards.values())
@@ -0,0 +1,235 @@
+"""Background refresh of news feeds with stale-while-revalidate reads.
+
+Readers never wait on the network for a feed that has been fetched before:
+``get`` hands back the last good items straight away and, if they are past
+the refresh point, queues a refresh on a small worker pool. A scheduler
+thread refreshes every tracked feed shortly before its TTL runs out, so in
+steady state visitors never see a stale feed at all. A failed refresh keeps
+the previous items and records the error, which is retried after a pause.
+
+Feeds passed to ``start`` (the presets) are kept for good. Any other feed a
+visitor asks for lives in a SizedLRU bounded by an estimated memory budget
+and a feed count; the least recently read are dropped, which also stops
+their background refreshes.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import news
+from sized_lru import SizedLRU
+
+log = logging.getLogger(__name__)
+
+# Refresh once a feed has used this share of its TTL.
+REFRESH_AT = 0.8
+SCHEDULE_INTERVAL = 30
+RETRY_AFTER = 300
+# Budget for feeds other than the pinned ones, per process.
+FEED_BUDGET = int(os.environ.get("NEWS_FEED_BUDGET_MB", "32")) * 2**20
+MAX_FEEDS = 256
+
+# items is None until the first successful fetch; fetched_at is the time of
+# the last successful fetch (0 if none) and last_error the message of the
+# last failed attempt, cleared by the next success.
+FeedState = namedtuple("FeedState", ["items", "fetched_at", "last_attempt", "last_error"])
+EMPTY = FeedState(None, 0.0, 0.0, None)
+
+FeedStatus = namedtuple(
+    "FeedStatus", ["query", "region", "fetched_at", "age", "stale", "refreshing", "last_attempt", "last_error"]
+)
+
+
+class FeedRefresher:
+    """Keeps the last good copy of every requested feed and refreshes it ahead of its TTL.
+
+    ``store`` is an optional FeedStore; known feeds are seeded from it, and
+    refreshes go through it so unchanged feeds cost a 304. New articles are
+    appended to ``archive`` (a NewsArchive) when one is given.
+    """
+
+    def __init__(self, store=None, archive=None, ttl=news.FEED_TTL, timeout=news.FETCH_TIMEOUT,
+                 interval=SCHEDULE_INTERVAL, retry_after=RETRY_AFTER, max_workers=news.MAX_WORKERS,
+                 budget=FEED_BUDGET, max_feeds=MAX_FEEDS, fetch=news.fetch_feed, clock=time.time):
+        self.store = store
+        self.archive = archive
+        self.ttl = ttl
+        self.timeout = timeout
+        self.interval = interval
+        self.retry_after = retry_after
+        self._fetch = fetch
+        self._clock = clock
+        self._pinned = {}
+        self._feeds = SizedLRU(budget, max_feeds)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Reads served from memory (fresh or stale) vs. reads of a feed with no items yet.
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-refresh")
+
+    # --- STATE ---
+    # Callers hold the lock.
+    def _lookup(self, pair, touch=False):
+        state = self._pinned.get(pair)
+        if state is None:
+            state = self._feeds.get(pair) if touch else self._feeds.peek(pair)
+        return state
+
+    def _set(self, pair, state):
+        if pair in self._pinned:
+            self._pinned[pair] = state
+        else:
+            self._feeds.put(pair, state)
+
+    def _load(self, pair):
+        if self.store is not None:
+            stored = self.store.load(news.feed_url(*pair))
+            if stored is not None:
+                return FeedState(stored.items, stored.fetched_at, 0.0, None)
+        return EMPTY
+
+    def _state(self, pair, touch=False):
+        state = self._lookup(pair, touch)
+        if state is None:
+            state = self._load(pair)
+            self._set(pair, state)
+        return state
+
+    def _tracked(self):
+        return list(self._pinned.items()) + self._feeds.items()
+
+    def _due(self, state, now):
+        if state.last_error is not None and now - state.last_attempt < self.retry_after:
+            return False
+        return state.items is None or now - state.fetched_at >= self.ttl * REFRESH_AT
+
+    # --- REFRESH ---
+    def _run(self, pair):
+        started = self._clock()
+        try:
+            items = self._fetch(*pair, store=self.store, max_age=0, timeout=self.timeout, archive=self.archive)
+        except Exception as e:
+            log.warning("refresh of %s/%s failed: %s", pair[0], pair[1], e)
+            metrics.inc("feed_refreshes", result="error")
+            with self._lock:
+                state = self._lookup(pair) or EMPTY
+                self._set(pair, state._replace(last_attempt=started, last_error=str(e) or type(e).__name__))
+            raise
+        else:
+            metrics.inc("feed_refreshes", result="ok")
+            with self._lock:
+                self._set(pair, FeedState(items, self._clock(), started, None))
+            return items
+        finally:
+            with self._lock:
+                self._pending.pop(pair, None)
+
+    def refresh(self, query, region='Global'):
+        """Queue a refresh unless one is already running; returns its future."""
+        pair = (query, region)
+        with self._lock:
+            self._state(pair)
+            future = self._pending.get(pair)
+            if future is None:
+                future = self._pending[pair] = self._pool.submit(self._run, pair)
+        return future
+
+    def refresh_due(self):
+        """Queue a refresh for every tracked feed that is due; returns how many were queued."""
+        now = self._clock()
+        with self._lock:
+            due = [pair for pair, state in self._tracked() if pair not in self._pending and self._due(state, now)]
+        for pair in due:
+            self.refresh(*pair)
+        return len(due)
+
+    # --- READ ---
+    def get(self, query, region='Global', wait=0.0):
+        """Last good FeedState for a feed, queueing a refresh if it is due.
+
+        Only a feed with no items yet waits, for at most ``wait`` seconds, on
+        its first fetch; everything else returns immediately.
+        """
+        pair = (query, region)
+        with self._lock:
+            state = self._state(pair, touch=True)
+            now = self._clock()
+            due = pair not in self._pending and self._due(state, now)
+            if state.items is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.stale_hits += now - state.fetched_at >= self.ttl
+        if due:
+            self.refresh(query, region)
+        if state.items is None and wait > 0:
+            with self._lock:
+                future = self._pending.get(pair)
+            if future is not None:
+                try:
+                    future.result(timeout=wait)
+                except Exception:
+                    # Timed out or failed; the state says which.
+                    pass
+            with self._lock:
+                # Still the old state if the new items did not fit the budget.
+                state = self._lookup(pair) or state
+        return state
+
+    def __len__(self):
+        return len(self._pinned) + len(self._feeds)
+
+    def memory(self):
+        """LRUStats of the unpinned feeds: reads, evictions and estimated bytes."""
+        return self._feeds.stats()
+
+    def status(self):
+        """FeedStatus of every tracked feed."""
+        now = self._clock()
+        with self._lock:
+            snapshot = [(pair, state, pair in self._pending) for pair, state in self._tracked()]
+        return [
+            FeedStatus(
+                query, region, state.fetched_at,
+                now - state.fetched_at if state.items is not None else None,
+                state.items is None or now - state.fetched_at >= self.ttl,
+                refreshing, state.last_attempt, state.last_error,
+            )
+            for (query, region), state, refreshing in sorted(snapshot, key=lambda row: row[0])
+        ]
+
+    # --- SCHEDULER ---
+    def start(self, pairs=()):
+        """Track ``pairs`` for good and start the scheduler thread (once)."""
+        with self._lock:
+            for pair in pairs:
+                pair = tuple(pair)
+                if pair not in self._pinned:
+                    state = self._feeds.pop(pair)
+                    self._pinned[pair] = state if state is not None else self._load(pair)
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._schedule, name="news-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _schedule(self):
+        while True:
+            try:
+                self.refresh_due()
+            except Exception:
+                log.exception("news refresh scheduling failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
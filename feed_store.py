@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_PATH = os.environ.get(
+    "NEWS_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "news.sqlite3"),
+)
+
+StoredFeed = namedtuple(
+    "StoredFeed", ["url", "etag", "modified", "fetched_at", "items", "seen", "new_count", "skipped_count"]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    modified      TEXT,
+    fetched_at    REAL NOT NULL,
+    items         TEXT NOT NULL,
+    seen          TEXT NOT NULL DEFAULT '[]',
+    new_count     INTEGER NOT NULL DEFAULT 0,
+    skipped_count INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+COLUMNS = "url, etag, modified, fetched_at, items, seen, new_count, skipped_count"
+
+
+def _dump_items(items):
+    return json.dumps([dict(item, timestamp=tuple(item['timestamp'])) for item in items], ensure_ascii=False)
+
+
+def _load_items(raw):
+    items = json.loads(raw)
+    for item in items:
+        item['timestamp'] = time.struct_time(item['timestamp'])
+    return items
+
+
+def _row_to_feed(row):
+    url, etag, modified, fetched_at, items, seen, new_count, skipped_count = row
+    return StoredFeed(url, etag, modified, fetched_at, _load_items(items), json.loads(seen), new_count, skipped_count)
+
+
+class FeedStore:
+    """SQLite-backed store of parsed feeds and their HTTP validators.
+
+    One connection is shared by every thread of the process; writes are
+    serialised with a lock and the database runs in WAL mode so readers in
+    other worker processes are not blocked.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+
+    def load(self, url):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {COLUMNS} FROM feeds WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return _row_to_feed(row)
+
+    def save(self, url, etag, modified, items, seen=(), stats=(0, 0), fetched_at=None):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO feeds ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, modified, fetched_at or time.time(), _dump_items(items),
+                 json.dumps(list(seen), ensure_ascii=False), stats[0], stats[1]),
+            )
+
+    def feeds(self):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {COLUMNS} FROM feeds ORDER BY url").fetchall()
+        return [_row_to_feed(row) for row in rows]
+
+    def touch(self, url, fetched_at=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE feeds SET fetched_at = ? WHERE url = ?", (fetched_at or time.time(), url)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+
+RISK_COLORS = {
+    'Critical (Frost)': '#d62728', 'High (Frost)': '#ff7f0e',
+    'High (Drought)': '#ff7f0e', 'High (Geopolitics)': '#ff7f0e',
+    'Medium': '#bcbd22', 'Low': '#2ca02c'
+}
+
+
+def supply_map_figure(markers, zoom, height=350):
+    fig = px.scatter_mapbox(
+        markers, lat="Lat", lon="Lon", color="Risk",
+        size="Size", hover_name="Region",
+        hover_data={"Output": True, "Count": bool(markers["Count"].max() > 1), "Size": False, "Lat": False, "Lon": False},
+        color_discrete_map=RISK_COLORS, zoom=zoom, height=height
+    )
+    fig.update_layout(mapbox_style="open-street-map", margin={"r": 0, "t": 0, "l": 0, "b": 0})
+    return fig
+
+
+class FigureCache:
+    """Bounded LRU of built figures.
+
+    Keys should capture everything the figure depends on, e.g.
+    (commodity, dataset version, theme). Cached figures are shared between
+    sessions and must not be mutated.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            figure = self._entries.get(key)
+            if figure is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+        figure = build()
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return figure
@@ -0,0 +1,191 @@
+"""Batched demand/supply forecasting for the market balance panel.
+
+Every production and consumption series is fitted at once: the series are
+stacked into one (series x years) matrix and additive exponential smoothing
+runs over a grid of candidate models in a single NumPy pass per time step,
+so the cost of a fit does not involve a per-commodity Python loop. Each
+series keeps the candidate with the lowest AIC; candidates cover the naive
+(random walk), simple exponential smoothing and Holt linear-trend models.
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+HORIZON = 3
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600}
+
+ALPHAS = np.linspace(0.1, 1.0, 10)
+BETAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+
+MODEL_NAMES = ("naive", "ses", "holt")
+
+Fit = namedtuple("Fit", ["model", "alpha", "beta", "level", "trend", "sigma", "nobs", "lag"])
+
+BalanceForecast = namedtuple("BalanceForecast", [
+    "commodities", "years",
+    "production", "production_lo", "production_hi",
+    "consumption", "consumption_lo", "consumption_hi",
+    "balance", "balance_lo", "balance_hi",
+    "models",
+])
+
+
+def _candidate_grid():
+    # (alpha, beta, has_trend, model index, number of smoothing parameters)
+    rows = [(1.0, 0.0, 0.0, 0, 0)]
+    rows += [(a, 0.0, 0.0, 1, 1) for a in ALPHAS]
+    rows += [(a, b, 1.0, 2, 2) for a in ALPHAS for b in BETAS]
+    return np.array(rows).T
+
+
+ALPHA, BETA, PHI, MODEL, NPARAMS = _candidate_grid()
+
+
+def fit(history):
+    """Fit every row of ``history`` (series x periods, NaN where a series has
+    no figure, as when it starts late or ends early).
+
+    Returns a Fit of per-series arrays; ``lag`` is the number of periods
+    after a series' last observation. Series with fewer than three
+    observations use the naive model; with fewer than two, sigma (and so
+    the interval) is unknown and left as NaN.
+    """
+    y = np.asarray(history, dtype=float)
+    if y.ndim == 1:
+        y = y[None, :]
+    n_series, n_periods = y.shape
+    observed = ~np.isnan(y)
+    nobs = observed.sum(axis=1)
+
+    # Initial level is the first observation; initial trend the first step.
+    first = observed.argmax(axis=1)
+    last = n_periods - 1 - observed[:, ::-1].argmax(axis=1)
+    rows = np.arange(n_series)
+    level0 = y[rows, first]
+    second = np.minimum(first + 1, n_periods - 1)
+    trend0 = np.where(nobs >= 2, y[rows, second] - level0, 0.0)
+    trend0 = np.nan_to_num(trend0)
+
+    alpha, beta, phi = ALPHA[:, None], BETA[:, None], PHI[:, None]
+    level = np.broadcast_to(level0, (len(ALPHA), n_series)).copy()
+    trend = phi * trend0
+    sse = np.zeros_like(level)
+
+    for t in range(n_periods):
+        # Steps up to and including a series' first observation only seed the state.
+        active = observed[:, t] & (t > first)
+        if not active.any():
+            continue
+        forecast = level + phi * trend
+        error = np.where(active, y[:, t] - forecast, 0.0)
+        sse += error * error
+        level = np.where(active, forecast + alpha * error, level)
+        trend = np.where(active, phi * (trend + alpha * beta * error), trend)
+
+    n_fit = np.maximum(nobs - 1, 1)
+    aic = n_fit * np.log(np.maximum(sse / n_fit, 1e-12)) + 2 * NPARAMS[:, None]
+    # With too few points to tell models apart, stay with the naive forecast.
+    aic[:, nobs < 3] = np.where(MODEL == 0, 0.0, np.inf)[:, None]
+    best = aic.argmin(axis=0)
+
+    sigma = np.sqrt(sse[best, rows] / n_fit)
+    sigma[nobs < 2] = np.nan
+    return Fit(
+        model=MODEL[best].astype(int),
+        alpha=ALPHA[best],
+        beta=BETA[best],
+        level=level[best, rows],
+        trend=trend[best, rows],
+        sigma=sigma,
+        nobs=nobs,
+        lag=n_periods - 1 - last,
+    )
+
+
+def predict(fitted, horizon=HORIZON):
+    """Point forecasts and forecast variances, each (series x horizon), for
+    the ``horizon`` periods after the last one of the fitted matrix.
+
+    A series that ended ``lag`` periods early is projected ``lag`` steps
+    further ahead, so every row covers the same periods.
+    """
+    h = np.arange(1, horizon + 1) + fitted.lag[:, None]
+    mean = fitted.level[:, None] + fitted.trend[:, None] * h
+    # Additive ETS: var_h = sigma^2 * (1 + sum_{j<h} (alpha + alpha * beta * j)^2)
+    has_trend = (fitted.model == 2)[:, None]
+    j = np.arange(horizon + int(fitted.lag.max(initial=0)))
+    c = fitted.alpha[:, None] + has_trend * fitted.alpha[:, None] * fitted.beta[:, None] * j
+    c2 = np.concatenate([np.ones((len(c), 1)), c[:, 1:] ** 2], axis=1)
+    variance = fitted.sigma[:, None] ** 2 * np.take_along_axis(np.cumsum(c2, axis=1), h - 1, axis=1)
+    return mean, variance
+
+
+def forecast_balances(commodities, years, production, consumption, horizon=HORIZON, level=0.8):
+    """Forecast production, consumption and their balance for all commodities.
+
+    ``production`` and ``consumption`` are (commodities x years) matrices
+    over the common ``years`` axis. Both are fitted in the same batch and
+    forecast for the years after the last one, whichever year each series
+    ends in; the balance interval treats their errors as independent.
+    """
+    production = np.asarray(production, dtype=float)
+    consumption = np.asarray(consumption, dtype=float)
+    n = len(commodities)
+    fitted = fit(np.vstack([production, consumption]))
+    mean, variance = predict(fitted, horizon)
+    z = Z_SCORES[level]
+
+    prod, cons = mean[:n], mean[n:]
+    prod_sd, cons_sd = np.sqrt(variance[:n]), np.sqrt(variance[n:])
+    bal_sd = np.sqrt(variance[:n] + variance[n:])
+    balance = prod - cons
+    last_year = int(years[-1]) if len(years) else 0
+    models = [(MODEL_NAMES[p], MODEL_NAMES[c]) for p, c in zip(fitted.model[:n], fitted.model[n:])]
+    return BalanceForecast(
+        commodities=list(commodities),
+        years=list(range(last_year + 1, last_year + horizon + 1)),
+        production=prod, production_lo=prod - z * prod_sd, production_hi=prod + z * prod_sd,
+        consumption=cons, consumption_lo=cons - z * cons_sd, consumption_hi=cons + z * cons_sd,
+        balance=balance, balance_lo=balance - z * bal_sd, balance_hi=balance + z * bal_sd,
+        models=models,
+    )
+
+
+# --- CACHE ---
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_CACHE_STATS = {"hits": 0, "misses": 0}
+CACHE_SIZE = 32
+
+
+def _digest(commodities, years, production, consumption, horizon, level):
+    h = hashlib.sha256()
+    h.update(repr((list(commodities), list(years), horizon, level)).encode("utf-8"))
+    for matrix in (production, consumption):
+        h.update(np.ascontiguousarray(matrix, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def cached_forecast_balances(commodities, years, production, consumption, horizon=HORIZON, level=0.8):
+    """forecast_balances memoized on a hash of its inputs, so reruns never refit."""
+    key = _digest(commodities, years, production, consumption, horizon, level)
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            _CACHE_STATS["hits"] += 1
+            return _CACHE[key]
+        _CACHE_STATS["misses"] += 1
+    result = forecast_balances(commodities, years, production, consumption, horizon, level)
+    with _CACHE_LOCK:
+        _CACHE[key] = result
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return result
+
+
+def cache_info():
+    """(hits, misses, size) of the forecast cache."""
+    with _CACHE_LOCK:
+        return _CACHE_STATS["hits"], _CACHE_STATS["misses"], len(_CACHE)
@@ -0,0 +1,341 @@
+"""Pooled HTTP/1.1 client for feed downloads, isolated per host.
+
+Every host gets its own keep-alive connections, at most ``max_connections``
+requests in flight, a token-bucket rate limit and a circuit breaker. A
+host that fails (network errors, timeouts, 5xx and 429) gets one request at
+a time while the others wait their turn, and after ``failure_threshold``
+consecutive failures none: requests fail at once with CircuitOpen rather
+than holding a refresh thread until they time out. ``reset_after`` seconds later a single probe request
+decides whether it is back.
+
+Waiting for a connection slot, a turn or a rate-limit token counts against
+the request's timeout, as does a slowly trickling response, so no request
+outlasts it, whatever the host does.
+"""
+import http.client
+import socket
+import threading
+import time
+import urllib.parse
+from collections import namedtuple
+
+import metrics
+
+# Per-host defaults; sources that need other limits pass their own.
+MAX_CONNECTIONS = 4
+RATE = 10.0
+BURST = 20
+FAILURE_THRESHOLD = 3
+RESET_AFTER = 60
+# Idle keep-alive connections older than this are closed instead of reused.
+IDLE_TIMEOUT = 30
+MAX_REDIRECTS = 5
+READ_CHUNK = 64 * 1024
+REDIRECTS = {301, 302, 303, 307, 308}
+
+HostStatus = namedtuple(
+    "HostStatus", ["host", "state", "failures", "requests", "reused", "idle", "in_flight", "retry_in"]
+)
+
+
+class CircuitOpen(ConnectionError):
+    """The host failed repeatedly and is not being called for now."""
+
+
+class Throttled(TimeoutError):
+    """No connection slot or rate-limit token came free within the timeout."""
+
+
+class HTTPStatusError(OSError):
+    def __init__(self, url, status):
+        super().__init__(f"HTTP {status} from {url}")
+        self.status = status
+
+
+class _Host:
+    # Mutable state of one host; guarded by ``lock`` except for ``slots``.
+    def __init__(self, name, scheme, max_connections=MAX_CONNECTIONS, rate=RATE, burst=BURST,
+                 failure_threshold=FAILURE_THRESHOLD, reset_after=RESET_AFTER, now=0.0):
+        self.name = name
+        self.scheme = scheme
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+        # Notified whenever a request finishes, for those waiting their turn.
+        self.changed = threading.Condition(self.lock)
+        self.idle = []
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled_at = now
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.requests = 0
+        self.reused = 0
+        self.in_flight = 0
+
+    # --- CIRCUIT BREAKER ---
+    def check(self, now):
+        """Raise CircuitOpen while the breaker is open and no probe is due."""
+        if self.failure_threshold is None:
+            return
+        with self.lock:
+            if self.opened_at is not None and (now - self.opened_at < self.reset_after or self.probing):
+                raise CircuitOpen(f"{self.name} is failing; not called for now")
+
+    def admit(self, clock, deadline):
+        """Reserve an in-flight request, or raise CircuitOpen or Throttled.
+
+        Once ``reset_after`` has passed on an open breaker, one probe is let
+        through. A host that has started failing but is not cut off yet gets
+        one request at a time: the others wait for its outcome (until their
+        deadline) rather than all hanging on the host at once.
+        """
+        with self.changed:
+            while self.failure_threshold is not None:
+                now = clock()
+                if self.opened_at is not None:
+                    if now - self.opened_at < self.reset_after or self.probing:
+                        raise CircuitOpen(f"{self.name} is failing; not called for now")
+                    self.probing = True
+                    break
+                if not (self.failures and self.in_flight):
+                    break
+                if now >= deadline:
+                    raise Throttled(f"{self.name} is failing; no turn came before the timeout")
+                self.changed.wait(deadline - now)
+            self.requests += 1
+            self.in_flight += 1
+
+    def finish(self, ok, now):
+        """Release an admitted request; ``ok`` is None when it was never sent."""
+        with self.changed:
+            self.in_flight -= 1
+            self.probing = False
+            self.changed.notify_all()
+            if ok is None:
+                return
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failure_threshold is None:
+                return
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    metrics.inc("http_circuit_opened", host=self.name)
+                self.opened_at = now
+
+    # --- RATE LIMIT ---
+    def take_token(self, now, deadline):
+        """Seconds to sleep before sending; raises Throttled past the deadline."""
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+            self.refilled_at = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if now + wait > deadline:
+                raise Throttled(f"rate limit for {self.name} leaves no time before the timeout")
+            # Reserved now, so concurrent callers queue behind each other.
+            self.tokens -= 1
+            return wait
+
+    # --- CONNECTIONS ---
+    def checkout(self, timeout, now):
+        with self.lock:
+            while self.idle:
+                conn, returned_at = self.idle.pop()
+                if now - returned_at < IDLE_TIMEOUT:
+                    self.reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.name, timeout=timeout), False
+
+    def checkin(self, conn, now):
+        with self.lock:
+            self.idle.append((conn, now))
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+def _expire(sock, expired):
+    expired.set()
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class HostPool:
+    """Thread-safe HTTP client keeping per-host connections, limits and breakers.
+
+    ``limits`` are the defaults for hosts seen for the first time:
+    max_connections, rate (requests per second), burst, failure_threshold
+    (None for no breaker) and reset_after. ``configure`` sets them for one
+    host.
+    """
+
+    def __init__(self, clock=time.monotonic, **limits):
+        self.limits = limits
+        self._clock = clock
+        self._hosts = {}
+        self._configured = {}
+        self._lock = threading.Lock()
+
+    def configure(self, url, **limits):
+        """Limits for the host of ``url``, replacing its state if already in use."""
+        parts = urllib.parse.urlsplit(url)
+        with self._lock:
+            self._configured[parts.netloc] = limits
+            host = self._hosts.pop(parts.netloc, None)
+        if host is not None:
+            host.close()
+
+    def _host(self, scheme, netloc):
+        with self._lock:
+            host = self._hosts.get(netloc)
+            if host is None:
+                limits = {**self.limits, **self._configured.get(netloc, {})}
+                host = self._hosts[netloc] = _Host(netloc, scheme, now=self._clock(), **limits)
+            return host
+
+    def request(self, url, headers=None, timeout=10):
+        """GET ``url``, following redirects; returns (status, body, headers).
+
+        Header names come back lower-cased. Error statuses are returned, not
+        raised; network errors and timeouts raise OSError subclasses, among
+        them CircuitOpen and Throttled. ``timeout`` bounds the whole call.
+        """
+        deadline = self._clock() + timeout
+        for _ in range(MAX_REDIRECTS + 1):
+            status, body, response_headers = self._request(url, headers or {}, deadline)
+            if status not in REDIRECTS or "location" not in response_headers:
+                return status, body, response_headers
+            url = urllib.parse.urljoin(url, response_headers["location"])
+        raise HTTPStatusError(url, status)
+
+    def _request(self, url, headers, deadline):
+        parts = urllib.parse.urlsplit(url)
+        host = self._host(parts.scheme, parts.netloc)
+        try:
+            host.check(self._clock())
+            if not host.slots.acquire(timeout=max(0.0, deadline - self._clock())):
+                raise Throttled(f"all {host.name} connections busy until the timeout")
+        except OSError as e:
+            metrics.inc("http_requests", host=host.name, result=type(e).__name__)
+            raise
+        try:
+            # Checked again: the host may have failed while this request queued.
+            host.admit(self._clock, deadline)
+            try:
+                time.sleep(host.take_token(self._clock(), deadline))
+            except Throttled:
+                # Not a verdict on the host; the next request may probe.
+                host.finish(None, self._clock())
+                raise
+            try:
+                status, body, response_headers = self._send(host, parts, headers, deadline)
+            except OSError:
+                host.finish(False, self._clock())
+                raise
+            host.finish(status < 500 and status != 429, self._clock())
+            metrics.inc("http_requests", host=host.name, result=str(status))
+            return status, body, response_headers
+        except OSError as e:
+            metrics.inc("http_requests", host=host.name, result=type(e).__name__)
+            raise
+        finally:
+            host.slots.release()
+
+    def _send(self, host, parts, headers, deadline):
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        for attempt in range(2):
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                raise TimeoutError(f"{host.name} timed out")
+            conn, reused = host.checkout(remaining, self._clock())
+            expired, watchdog = threading.Event(), None
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                sock = conn.sock
+                # Socket timeouts apply per read, so a server dripping bytes
+                # would never trip them; this cuts the connection at the deadline.
+                watchdog = threading.Timer(max(0.0, deadline - self._clock()), _expire, (sock, expired))
+                watchdog.daemon = True
+                watchdog.start()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = self._read(host, response, sock, deadline)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if expired.is_set():
+                    raise TimeoutError(f"{host.name} timed out") from e
+                # A kept-alive connection the server has since closed: retry
+                # once on a fresh one.
+                if isinstance(e, ConnectionError) and reused and attempt == 0:
+                    continue
+                if isinstance(e, http.client.HTTPException):
+                    raise ConnectionError(f"bad response from {host.name}: {e!r}") from e
+                raise
+            finally:
+                if watchdog is not None:
+                    watchdog.cancel()
+            if expired.is_set():
+                conn.close()
+                raise TimeoutError(f"{host.name} timed out")
+            if response.will_close:
+                conn.close()
+            else:
+                host.checkin(conn, self._clock())
+            return response.status, body, {k.lower(): v for k, v in response.getheaders()}
+
+    def _read(self, host, response, sock, deadline):
+        # In chunks, each read bounded by the time left.
+        chunks = []
+        while True:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                raise TimeoutError(f"{host.name} timed out")
+            sock.settimeout(remaining)
+            chunk = response.read1(READ_CHUNK)
+            if not chunk:
+                # read1 leaves a fully read response open, and the
+                # connection refuses new requests until it is closed.
+                response.close()
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def status(self):
+        """HostStatus of every host called so far."""
+        now = self._clock()
+        with self._lock:
+            hosts = sorted(self._hosts.values(), key=lambda host: host.name)
+        rows = []
+        for host in hosts:
+            with host.lock:
+                if host.opened_at is None:
+                    state, retry_in = "closed", None
+                else:
+                    retry_in = max(0.0, host.opened_at + host.reset_after - now)
+                    state = "half-open" if host.probing or not retry_in else "open"
+                rows.append(HostStatus(host.name, state, host.failures, host.requests, host.reused,
+                                       len(host.idle), host.in_flight, retry_in))
+        return rows
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            hosts = list(self._hosts.values())
+        for host in hosts:
+            host.close()
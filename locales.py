@@ -0,0 +1,232 @@
+"""Compiled locale catalog: every user-facing string, by language.
+
+Each language has one source file, data/locales/<code>.json:
+
+    {"name":          "Türkçe",
+     "ui":            {key: text},
+     "sectors":       {sector id: name},
+     "statuses":      {status id: label},
+     "facts":         {commodity: {"producers", "uses", "desc"}},
+     "default_facts": {"producers", "uses", "desc"},
+     "presets":       {preset: {"query": news search term, "aliases": [names]}}}
+
+Only strings live here; shares, coordinates and figures are stored once, in
+the dataset (see dataset.py). Compiling merges each locale over the default
+one, so a missing string falls back to English at build time rather than
+on every lookup, and writes one marshal file per locale, an index of names
+and versions, and the preset aliases of all locales (read only to match
+typed queries). Builds are redone when a source file changes, and by a
+different Python or marshal version.
+
+Locales are read on first use: a worker holds only the languages its
+visitors picked, however many are available.
+"""
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(ROOT, "data", "locales")
+DEFAULT_DIR = os.environ.get("LOCALE_DIR", os.path.join(ROOT, ".cache", "locales"))
+DEFAULT = "en"
+FORMAT_VERSION = 1
+# marshal output is only guaranteed to load on the Python that wrote it.
+RUNTIME = (sys.version_info[:2], marshal.version)
+INDEX = "index.marshal"
+ALIASES = "aliases.marshal"
+
+Locale = namedtuple(
+    "Locale", ["code", "name", "version", "ui", "sectors", "statuses", "facts", "default_facts", "terms"]
+)
+
+
+# --- BUILD ---
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write(obj, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        marshal.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def compile_locale(code, source, default):
+    """Plain-dict form of one locale source, merged over ``default``."""
+    default_facts, own_facts = default.get("facts", {}), source.get("facts", {})
+    facts = {
+        commodity: {**default_facts.get(commodity, {}), **own_facts.get(commodity, {})}
+        for commodity in {**default_facts, **own_facts}
+    }
+    return {
+        "code": code,
+        "name": source.get("name", code),
+        "ui": {**default.get("ui", {}), **source.get("ui", {})},
+        "sectors": {**default.get("sectors", {}), **source.get("sectors", {})},
+        "statuses": {**default.get("statuses", {}), **source.get("statuses", {})},
+        "facts": facts,
+        "default_facts": {**default.get("default_facts", {}), **source.get("default_facts", {})},
+        # Search terms are not inherited: other queries are sent as typed.
+        "terms": {preset: entry["query"] for preset, entry in source.get("presets", {}).items() if entry.get("query")},
+    }
+
+
+def build(source_dir, out_dir, stamps):
+    """Compile every locale in ``source_dir`` into ``out_dir``; returns the index."""
+    os.makedirs(out_dir, exist_ok=True)
+    default_raw = _read_bytes(os.path.join(source_dir, f"{DEFAULT}.json"))
+    default = json.loads(default_raw)
+    index = {"format": FORMAT_VERSION, "runtime": RUNTIME, "stamps": stamps, "names": {}, "versions": {}}
+    aliases = {}
+    # The default first: its names win alias clashes.
+    for code in sorted(stamps, key=lambda code: (code != DEFAULT, code)):
+        raw = _read_bytes(os.path.join(source_dir, f"{code}.json"))
+        source = json.loads(raw)
+        compiled = compile_locale(code, source, default)
+        compiled["version"] = hashlib.sha256(default_raw + b"\0" + raw).hexdigest()[:16]
+        _write(compiled, os.path.join(out_dir, f"{code}.marshal"))
+        index["names"][code] = compiled["name"]
+        index["versions"][code] = compiled["version"]
+        for preset, entry in source.get("presets", {}).items():
+            for name in [entry.get("query")] + entry.get("aliases", []):
+                if name:
+                    aliases.setdefault(name, preset)
+    _write(aliases, os.path.join(out_dir, ALIASES))
+    _write(index, os.path.join(out_dir, INDEX))
+    return index
+
+
+def source_stamps(source_dir):
+    """(mtime, size) of every locale source, by code."""
+    stamps = {}
+    for name in os.listdir(source_dir):
+        if name.endswith(".json"):
+            stat = os.stat(os.path.join(source_dir, name))
+            stamps[name[:-len(".json")]] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def ensure_compiled(source_dir=SOURCE_DIR, out_dir=DEFAULT_DIR):
+    """The index of an up-to-date build, compiling the locales if needed."""
+    stamps = source_stamps(source_dir)
+    try:
+        with open(os.path.join(out_dir, INDEX), "rb") as f:
+            index = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        index = None
+    if (index is None or index.get("format") != FORMAT_VERSION or index.get("runtime") != RUNTIME
+            or index.get("stamps") != stamps):
+        index = build(source_dir, out_dir, stamps)
+    return index
+
+
+# --- READ ---
+class LocaleCatalog:
+    """The compiled locales of one source directory, each loaded on first use.
+
+    Unknown language codes get the default locale. Locales handed out are
+    shared by all sessions of the process and read-only.
+    """
+
+    def __init__(self, source_dir=SOURCE_DIR, out_dir=DEFAULT_DIR):
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self._index = None
+        self._aliases = None
+        self._locales = {}
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = ensure_compiled(self.source_dir, self.out_dir)
+        return self._index
+
+    def languages(self):
+        """Available language codes, the default first."""
+        return tuple(self.index["names"])
+
+    def names(self):
+        """Display name of every language, by code."""
+        return dict(self.index["names"])
+
+    def resolve(self, code):
+        return code if code in self.index["names"] else DEFAULT
+
+    def version(self, code):
+        return self.index["versions"][self.resolve(code)]
+
+    def aliases(self):
+        """Every preset name, search term and alias of every locale -> preset."""
+        if self._aliases is None:
+            self.index
+            with open(os.path.join(self.out_dir, ALIASES), "rb") as f:
+                self._aliases = marshal.load(f)
+        return self._aliases
+
+    def loaded(self):
+        return tuple(self._locales)
+
+    def load(self, code):
+        code = self.resolve(code)
+        locale = self._locales.get(code)
+        if locale is None:
+            with self._lock:
+                locale = self._locales.get(code)
+                if locale is None:
+                    locale = self._locales[code] = self._read(code)
+        return locale
+
+    def _read(self, code):
+        with open(os.path.join(self.out_dir, f"{code}.marshal"), "rb") as f:
+            compiled = marshal.load(f)
+        return Locale(
+            code, compiled["name"], compiled["version"],
+            MappingProxyType(compiled["ui"]),
+            MappingProxyType(compiled["sectors"]),
+            MappingProxyType(compiled["statuses"]),
+            MappingProxyType({commodity: MappingProxyType(fact) for commodity, fact in compiled["facts"].items()}),
+            MappingProxyType(compiled["default_facts"]),
+            MappingProxyType(compiled["terms"]),
+        )
+
+
+CATALOG = LocaleCatalog()
+
+
+def load(code):
+    return CATALOG.load(code)
+
+
+def ui(code):
+    """UI strings of a language, by key."""
+    return CATALOG.load(code).ui
+
+
+def languages():
+    return CATALOG.languages()
+
+
+def names():
+    return CATALOG.names()
+
+
+def resolve(code):
+    return CATALOG.resolve(code)
+
+
+def version(code):
+    return CATALOG.version(code)
+
+
+def aliases():
+    return CATALOG.aliases()
@@ -0,0 +1,214 @@
+"""Lightweight in-process metrics: timing spans, counters and a Prometheus export.
+
+Instrumentation is off unless DASHBOARD_METRICS is set (or ``enable()`` is
+called). While off, ``span`` hands back a shared no-op context manager and
+``timed``/``inc`` return after a single flag check, so the hooks can stay
+on hot paths.
+
+Cache statistics are not pushed: each cache registers a collector that
+reads its own hit/miss counters when the metrics are exported, which costs
+nothing between exports and works with the instrumentation off.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("DASHBOARD_METRICS", "").lower() not in ("", "0", "false", "no")
+PREFIX = "dashboard"
+
+# Histogram bucket upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SpanStats = namedtuple("SpanStats", ["name", "count", "total", "max", "buckets"])
+# evictions and bytes are None for caches that do not track them.
+CacheStats = namedtuple("CacheStats", ["name", "hits", "misses", "size", "evictions", "bytes"], defaults=(None, None))
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_collectors = {}
+_NULL_SPAN = nullcontext()
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# --- RECORDING ---
+def observe(name, seconds):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        stats[3][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+
+
+def span(name):
+    """Context manager timing a block under ``name``."""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator timing every call of the function under ``name``."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def inc(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def register_cache(name, stats):
+    """Register ``stats()`` -> (hits, misses, size[, evictions[, bytes]]) as the
+    collector of a cache.
+
+    Registering the same name again replaces the collector.
+    """
+    _collectors[name] = stats
+
+
+def from_cache_info(info):
+    """(hits, misses, size) of a functools CacheInfo."""
+    return info.hits, info.misses, info.currsize
+
+
+def lru_stats(cached):
+    """Collector for a functools.lru_cache wrapped function."""
+    return lambda: from_cache_info(cached.cache_info())
+
+
+# --- READING ---
+def spans():
+    with _lock:
+        return [SpanStats(name, s[0], s[1], s[2], list(s[3])) for name, s in sorted(_spans.items())]
+
+
+def counters():
+    with _lock:
+        return [(name, dict(labels), value) for (name, labels), value in sorted(_counters.items())]
+
+
+def caches():
+    result = []
+    for name, stats in sorted(_collectors.items()):
+        try:
+            result.append(CacheStats(name, *stats()))
+        except Exception:
+            continue
+    return result
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join('{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"')) for key, value in labels.items())
+    return "{" + body + "}"
+
+
+def export_text():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    span_stats = spans()
+    if span_stats:
+        metric = f"{PREFIX}_span_seconds"
+        lines += [f"# HELP {metric} Time spent in instrumented code.", f"# TYPE {metric} histogram"]
+        for s in span_stats:
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), s.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{_labels({"span": s.name, "le": le})} {cumulative}')
+            lines.append(f'{metric}_sum{_labels({"span": s.name})} {s.total!r}')
+            lines.append(f'{metric}_count{_labels({"span": s.name})} {s.count}')
+
+    cache_stats = caches()
+    for field, kind, help_text in (
+        ("hits", "counter", "Cache lookups served from the cache."),
+        ("misses", "counter", "Cache lookups that had to build the value."),
+        ("size", "gauge", "Entries currently held by the cache."),
+        ("evictions", "counter", "Entries dropped to stay within the cache bounds."),
+        ("bytes", "gauge", "Estimated memory held by the cache."),
+    ):
+        tracked = [c for c in cache_stats if getattr(c, field) is not None]
+        if not tracked:
+            continue
+        metric = f"{PREFIX}_cache_{field}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{_labels({"cache": c.name})} {getattr(c, field)}' for c in tracked]
+
+    seen = set()
+    for name, labels, value in counters():
+        metric = f"{PREFIX}_{name}_total"
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# --- EXPORT ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = export_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    """Serve /metrics for Prometheus on a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,300 @@
+import heapq
+import os
+import re
+import time
+import unicodedata
+import urllib.parse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+import locales
+import metrics
+from http_pool import HostPool, HTTPStatusError
+from summary_cleaner import clean_summaries
+
+
+# --- FEED CONFIGURATION ---
+PRESETS = ["Hazelnuts", "Cocoa", "Avocados", "Coffee", "Wheat", "Corn", "Soybeans", "Palm Oil", "Cotton", "Sugar"]
+
+# Overridable so benchmarks can point the engine at a local stand-in server.
+NEWS_HOST = os.environ.get("NEWS_RSS_HOST", "https://news.google.com")
+
+# url is a template with {host} and {term}; host None means NEWS_HOST and
+# terms None the preset search terms of the source's locale. label is the UI
+# string key of the region's display name (or the name itself).
+FeedSource = namedtuple("FeedSource", ["region", "url", "lang", "terms", "host", "label", "limits"])
+SOURCES = {}
+REGIONS = []
+
+
+def register_source(region, url, lang="en", terms=None, host=None, label=None, **limits):
+    """Serve ``region``'s news from another feed (or add a region).
+
+    ``terms`` maps preset names to the query sent, by default the search
+    terms of the ``lang`` locale; other queries are sent as typed. A
+    source outside Google News sets ``host``, and its URL need not use
+    {term} at all::
+
+        register_source("Trade press", "{host}/feeds/{term}.rss", host="https://feeds.example.com", rate=1)
+
+    ``label`` is the key of the region's name among the UI strings of the
+    locales, or a name shown as is; by default the region itself.
+    ``limits`` (max_connections, rate, burst, failure_threshold,
+    reset_after; see http_pool) apply to the source's host.
+    """
+    SOURCES[region] = FeedSource(region, url, lang, None if terms is None else dict(terms), host, label or region, limits)
+    if region not in REGIONS:
+        REGIONS.append(region)
+    if limits:
+        HTTP.configure(host or NEWS_HOST, **limits)
+
+
+def feed_source(region):
+    return SOURCES.get(region) or SOURCES["Global"]
+
+
+def region_label(region, ui):
+    """Display name of ``region`` given the UI strings of a locale."""
+    label = SOURCES[region].label if region in SOURCES else region
+    return ui.get(label, label)
+
+
+# Items kept per feed; the news grid pages through them.
+MAX_ITEMS = 200
+FEED_TTL = 3600
+MAX_WORKERS = 8
+# Seconds a whole download may take, waiting on the host's limits included.
+FETCH_TIMEOUT = 10
+# Longest custom query kept; anything longer is cut at a word boundary.
+MAX_QUERY_LENGTH = 60
+
+# Shared by every feed download: keep-alive connections, rate limits and a
+# circuit breaker per host, so one failing upstream cannot hold up the rest.
+HTTP = HostPool()
+
+register_source("Global", "{host}/rss/search?q={term}+commodity+market&hl=en-US&gl=US&ceid=US:en", label="global_opt")
+register_source("Turkey", "{host}/rss/search?q={term}&hl=tr&gl=TR&ceid=TR:tr", lang="tr", label="local_opt")
+
+
+def feed_url(query, region='Global'):
+    source = feed_source(region)
+    terms = locales.load(source.lang).terms if source.terms is None else source.terms
+    search_term = terms.get(query, query)
+    return source.url.format(host=source.host or NEWS_HOST, term=search_term.replace(" ", "%20"))
+
+
+def preset_pairs():
+    return [(query, region) for query in PRESETS for region in REGIONS]
+
+
+# --- QUERY NORMALIZATION ---
+_TR_FOLD = str.maketrans({"ı": "i", "İ": "i"})
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def fold(text):
+    """Case- and accent-insensitive form of text; the Turkish dotless and
+    dotted i both become "i". Shared by query matching, the archive index
+    and duplicate detection."""
+    text = text or ""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.translate(_TR_FOLD))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+def fold_query(text):
+    """Case-, accent- and punctuation-insensitive form of a query, for matching."""
+    return _NON_WORD.sub(" ", fold(text)).strip()
+
+
+@lru_cache(maxsize=1)
+def _canonical():
+    # Other names users type for the presets: spelling variants and the
+    # names and search terms of every locale, from the locale index.
+    canonical = {fold_query(name): preset for name, preset in locales.aliases().items()}
+    canonical.update((fold_query(preset), preset) for preset in PRESETS)
+    return canonical
+
+
+def normalize_query(text):
+    """Canonical commodity query for free text.
+
+    Known names in any case, spelling variant or language map to their
+    preset ("  fındık " -> "Hazelnuts", "palm oil" -> "Palm Oil"). Anything
+    else gets single spaces, capitalised words and at most MAX_QUERY_LENGTH
+    characters, so variants of one custom query share one feed and one
+    cache entry. Returns "" for text without words.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    folded = fold_query(text)
+    if not folded:
+        return ""
+    canonical = _canonical()
+    preset = canonical.get(folded) or (canonical.get(folded[:-1]) if folded.endswith("s") else None)
+    if preset:
+        return preset
+    words = " ".join(text.split())
+    if len(words) > MAX_QUERY_LENGTH:
+        words = words[:MAX_QUERY_LENGTH + 1].rsplit(" ", 1)[0][:MAX_QUERY_LENGTH]
+    return " ".join(word[:1].upper() + word[1:].lower() for word in words.split())
+
+
+# --- INGESTION ---
+IngestStats = namedtuple("IngestStats", ["new", "skipped"])
+
+
+def _by_time(item):
+    return item['timestamp']
+
+
+def entry_key(entry):
+    return entry.get('id') or entry.get('link')
+
+
+def parse_entry(entry, clean_summary):
+    published_parsed = entry.get('published_parsed', time.gmtime())
+    date_str = time.strftime("%d %b %Y", published_parsed)
+
+    return {
+        'guid': entry_key(entry),
+        'title': entry.title,
+        'link': entry.link,
+        'published': date_str,
+        'timestamp': published_parsed,
+        'source': entry.source.title if 'source' in entry else 'Google News',
+        'summary': clean_summary
+    }
+
+
+def ingest_entries(entries, buffer=(), seen=(), limit=MAX_ITEMS, on_fresh=None):
+    """Merge only the entries not seen before into a sorted, capped buffer.
+
+    ``buffer`` is the previous result (newest first) and ``seen`` the GUIDs
+    or links of the previous refresh. Returns the new buffer, the keys to
+    remember for the next refresh and the new/skipped counts. ``on_fresh``,
+    if given, is called with the newly parsed items before they are capped.
+    """
+    seen = set(seen)
+    seen.update(item.get('guid') or item['link'] for item in buffer)
+    keys = []
+    fresh = []
+    for entry in entries:
+        key = entry_key(entry)
+        keys.append(key)
+        if key in seen:
+            continue
+        seen.add(key)
+        fresh.append(entry)
+    with metrics.span("summary_clean"):
+        summaries = clean_summaries([entry.get('summary', '') for entry in fresh])
+    fresh = [parse_entry(entry, summary) for entry, summary in zip(fresh, summaries)]
+    fresh.sort(key=_by_time, reverse=True)
+    if on_fresh is not None and fresh:
+        on_fresh(fresh)
+
+    merged = list(islice(heapq.merge(buffer, fresh, key=_by_time, reverse=True), limit))
+    return merged, keys, IngestStats(len(fresh), len(keys) - len(fresh))
+
+
+# --- FETCH ---
+def download(url, etag=None, modified=None, timeout=FETCH_TIMEOUT):
+    """Conditional GET through the shared host pool.
+
+    Returns (status, body, headers) with lower-cased header names; a 304
+    comes back as a status rather than an error. Other HTTP errors,
+    connection failures, timeouts and calls to a host whose circuit is
+    open raise (all OSError).
+    """
+    # feedparser is imported where feeds are fetched: only refresh threads
+    # do that, and pages should not wait on the import.
+    import feedparser
+
+    # Turkish queries are stored as IRIs; percent-encode them on the wire.
+    wire_url = urllib.parse.quote(url, safe=":/?&=%+")
+    headers = {"User-Agent": feedparser.USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    status, body, response_headers = HTTP.request(wire_url, headers, timeout=timeout)
+    if status >= 400:
+        raise HTTPStatusError(url, status)
+    return status, body, response_headers
+
+
+def fetch_feed(query, region='Global', store=None, max_age=FEED_TTL, timeout=FETCH_TIMEOUT, archive=None):
+    """Fetch one feed, going through the on-disk store when one is given.
+
+    A stored copy younger than ``max_age`` seconds is served without any
+    request. Otherwise the stored ETag/Last-Modified are sent back so an
+    unchanged feed costs a 304, and an unparseable response falls back to
+    the last stored items. Network errors and timeouts raise, so callers
+    can tell a failed refresh from an empty feed. Items seen for the first
+    time are appended to ``archive`` (a NewsArchive) when one is given.
+    """
+    url = feed_url(query, region)
+    stored = store.load(url) if store is not None else None
+    if stored is not None and time.time() - stored.fetched_at < max_age:
+        metrics.inc("feed_fetches", result="stored")
+        return stored.items
+
+    with metrics.span("feed_download"):
+        status, body, headers = download(
+            url,
+            etag=stored.etag if stored else None,
+            modified=stored.modified if stored else None,
+            timeout=timeout,
+        )
+    if stored is not None and status == 304:
+        metrics.inc("feed_fetches", result="not_modified")
+        store.touch(url)
+        return stored.items
+
+    import feedparser
+
+    with metrics.span("feed_parse"):
+        feed = feedparser.parse(body, response_headers=headers)
+    if stored is not None and not feed.entries and feed.get('bozo'):
+        metrics.inc("feed_fetches", result="unparseable")
+        return stored.items
+
+    metrics.inc("feed_fetches", result="fetched")
+    def archive_fresh(fresh):
+        with metrics.span("archive_add"):
+            archive.add(query, region, fresh)
+
+    items, seen, stats = ingest_entries(
+        feed.entries,
+        buffer=stored.items if stored else (),
+        seen=stored.seen if stored else (),
+        on_fresh=archive_fresh if archive is not None else None,
+    )
+    metrics.inc("feed_items", stats.new, result="new")
+    metrics.inc("feed_items", stats.skipped, result="skipped")
+    if store is not None and feed.entries:
+        with metrics.span("feed_store_save"):
+            store.save(url, headers.get('etag'), headers.get('last-modified'), items, seen=seen, stats=stats)
+    return items
+
+
+def fetch_news_batch(pairs, fetch=fetch_feed, max_workers=MAX_WORKERS):
+    """Fetch many (query, region) feeds concurrently on a bounded thread pool.
+
+    Returns a dict keyed by pair. A feed that raises maps to its exception
+    instead of aborting the whole batch.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+
+    def run(pair):
+        try:
+            return fetch(*pair)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs)), thread_name_prefix="news-fetch") as pool:
+        return dict(zip(pairs, pool.map(run, pairs)))
@@ -0,0 +1,243 @@
+"""Append-only news archive with full-text search.
+
+Every article the feed refresh sees for the first time is appended here, so
+coverage outlives the rolling per-feed buffer. Articles are keyed by GUID
+and linked to each (commodity, region) feed they appeared in; their title,
+summary and source are indexed in a contentless SQLite FTS5 table.
+
+Indexed text and queries are folded the same way, with ``news.fold``
+(lower case, no diacritics, Turkish dotless/dotted i mapped to "i"), so
+"findik" finds "Fındık".
+"""
+import calendar
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import news
+from feed_store import DEFAULT_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id          INTEGER PRIMARY KEY,
+    guid        TEXT NOT NULL UNIQUE,
+    title       TEXT NOT NULL,
+    link        TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    summary     TEXT NOT NULL,
+    lang        TEXT NOT NULL,
+    published   INTEGER NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS articles_source ON articles (source, published);
+CREATE TABLE IF NOT EXISTS article_feeds (
+    article_id  INTEGER NOT NULL REFERENCES articles (id),
+    commodity   TEXT NOT NULL,
+    region      TEXT NOT NULL,
+    PRIMARY KEY (commodity, region, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS article_feeds_article ON article_feeds (article_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, source, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+SearchResult = namedtuple("SearchResult", ["total", "items", "capped"])
+
+# Searches look at no more than this many matches (the newest, for text
+# queries): they are what gets ranked and counted, which keeps broad
+# queries in the milliseconds however large the archive grows.
+MATCH_WINDOW = 1000
+
+_TERM = re.compile(r"\w+\*?")
+
+
+def match_query(text):
+    """FTS5 MATCH expression for free text: every word must occur, a
+    trailing * makes a word a prefix. Returns None if there are no words."""
+    terms = []
+    for term in _TERM.findall(news.fold(text)):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def _placeholders(values):
+    return ",".join("?" * len(values))
+
+
+class NewsArchive:
+    """SQLite archive of every article seen, searchable by text and filters.
+
+    Shares the news store's database file by default. Like FeedStore, one
+    connection serves all threads of the process with writes serialised by
+    a lock; WAL mode keeps readers in other workers unblocked.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    # --- WRITE ---
+    def add(self, commodity, region, items, archived_at=None):
+        """Append parsed news items seen on one feed; returns how many were new.
+
+        Items already archived (same GUID) are only linked to this feed.
+        """
+        archived_at = archived_at or time.time()
+        lang = news.feed_source(region).lang
+        added = 0
+        # Oldest first, so archive (row id) order follows publication order
+        # as closely as arrival allows; searches rely on it for recency.
+        items = sorted(items, key=lambda item: item['timestamp'])
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                for item in items:
+                    guid = item.get('guid') or item['link']
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO articles (guid, title, link, source, summary, lang, published, archived_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (guid, item['title'], item['link'], item['source'], item['summary'], lang,
+                         calendar.timegm(item['timestamp']), archived_at),
+                    )
+                    if cursor.rowcount:
+                        article_id = cursor.lastrowid
+                        conn.execute(
+                            "INSERT INTO articles_fts (rowid, title, summary, source) VALUES (?, ?, ?, ?)",
+                            (article_id, news.fold(item['title']), news.fold(item['summary']), news.fold(item['source'])),
+                        )
+                        added += 1
+                    else:
+                        article_id = conn.execute("SELECT id FROM articles WHERE guid = ?", (guid,)).fetchone()[0]
+                    conn.execute(
+                        "INSERT OR IGNORE INTO article_feeds (article_id, commodity, region) VALUES (?, ?, ?)",
+                        (article_id, commodity, region),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    # --- SEARCH ---
+    def search(self, text="", commodities=(), regions=(), langs=(), sources=(),
+               since=None, until=None, order="relevance", limit=50, offset=0):
+        """Articles matching ``text`` and every given filter.
+
+        ``since``/``until`` are Unix timestamps bounding the publication
+        time. Text queries walk the index from the most recently archived
+        match and stop early: ``order="relevance"`` ranks the newest
+        MATCH_WINDOW matches by BM25, ``order="newest"`` takes them in archive
+        order. Without text, results are newest published first. ``total``
+        counts at most MATCH_WINDOW matches; ``capped`` says there may be more.
+        """
+        where, params = [], []
+        if commodities or regions:
+            feed_where = []
+            if commodities:
+                feed_where.append(f"f.commodity IN ({_placeholders(commodities)})")
+                params += list(commodities)
+            if regions:
+                feed_where.append(f"f.region IN ({_placeholders(regions)})")
+                params += list(regions)
+            where.append(f"EXISTS (SELECT 1 FROM article_feeds f WHERE f.article_id = a.id AND {' AND '.join(feed_where)})")
+        if langs:
+            where.append(f"a.lang IN ({_placeholders(langs)})")
+            params += list(langs)
+        if sources:
+            where.append(f"a.source IN ({_placeholders(sources)})")
+            params += list(sources)
+        if since is not None:
+            where.append("a.published >= ?")
+            params.append(int(since))
+        if until is not None:
+            where.append("a.published < ?")
+            params.append(int(until))
+
+        columns = "a.id, a.guid, a.title, a.link, a.source, a.summary, a.lang, a.published"
+        match = match_query(text)
+        with self._lock:
+            if match:
+                # FTS5 yields matches in rowid order without sorting and the
+                # filters are checked per match, so the LIMIT ends the scan
+                # early. CROSS JOIN keeps the planner from driving the query
+                # from an articles index and probing the FTS table per row.
+                score = "bm25(articles_fts)" if order == "relevance" else "0"
+                hits = self._conn.execute(
+                    " AND ".join([f"SELECT a.id, {score} FROM articles_fts CROSS JOIN articles a"
+                                  " ON a.id = articles_fts.rowid WHERE articles_fts MATCH ?"] + where)
+                    + f" ORDER BY articles_fts.rowid DESC LIMIT {MATCH_WINDOW + 1}",
+                    [match] + params,
+                ).fetchall()
+                total = len(hits)
+                hits = hits[:MATCH_WINDOW]
+                if order == "relevance":
+                    hits.sort(key=lambda hit: hit[1])
+                ids = [hit[0] for hit in hits[offset:offset + limit]]
+                by_id = {row[0]: row for row in self._conn.execute(
+                    f"SELECT {columns} FROM articles a WHERE a.id IN ({_placeholders(ids)})", ids
+                )}
+                rows = [by_id[article_id] for article_id in ids]
+            else:
+                clause = f" WHERE {' AND '.join(where)}" if where else ""
+                total = self._conn.execute(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM articles a{clause} LIMIT {MATCH_WINDOW + 1})", params
+                ).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM articles a{clause} ORDER BY a.published DESC, a.id DESC LIMIT ? OFFSET ?",
+                    params + [limit, offset],
+                ).fetchall()
+            feeds = {}
+            if rows:
+                ids = [row[0] for row in rows]
+                for article_id, commodity in self._conn.execute(
+                    f"SELECT article_id, commodity FROM article_feeds WHERE article_id IN ({_placeholders(ids)})", ids
+                ):
+                    feeds.setdefault(article_id, []).append(commodity)
+
+        items = []
+        for article_id, guid, title, link, source_name, summary, lang, published in rows:
+            timestamp = time.gmtime(published)
+            items.append({
+                'guid': guid,
+                'title': title,
+                'link': link,
+                'published': time.strftime("%d %b %Y", timestamp),
+                'timestamp': timestamp,
+                'source': source_name,
+                'summary': summary,
+                'lang': lang,
+                'commodities': sorted(set(feeds.get(article_id, []))),
+            })
+        return SearchResult(min(total, MATCH_WINDOW), items, total > MATCH_WINDOW)
+
+    def sources(self, limit=200):
+        """Most frequent sources, for filter pickers."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source FROM articles GROUP BY source ORDER BY COUNT(*) DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
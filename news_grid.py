@@ -0,0 +1,144 @@
+"""Pre-rendered HTML for the news card grid.
+
+A page of cards is rendered into one HTML string so the news section sends a
+single delta instead of a column layout and one markdown call per card.
+Templates are built once at import; every field is escaped and links that
+are not http(s) are dropped. Rendering is per page, so the cost of a page
+does not depend on how many articles the feed holds.
+"""
+import html
+from functools import lru_cache
+
+PAGE_SIZE = 12
+
+# Kept on one line per element and free of blank lines: st.markdown treats
+# the whole block as raw HTML only while no line is blank or indented.
+_CARD = (
+    '<div class="news-card"><div>'
+    '<div class="news-meta">{source} • {published}</div>'
+    '<div class="news-title">{title}</div>'
+    '<div class="news-summary">{summary}</div>'
+    '</div>{link}</div>'
+).format
+_LINK = '<a href="{href}" target="_blank" rel="noopener noreferrer" class="read-more-btn">{label}</a>'.format
+_GRID = '<div class="news-grid">{cards}</div>'.format
+
+SAFE_SCHEMES = ("http://", "https://")
+
+# Card styles, shared by the app and the static snapshots.
+CSS = """\
+/* NEWS GRID */
+.news-grid {
+    display: grid;
+    grid-template-columns: repeat(3, minmax(0, 1fr));
+    gap: 0 1rem;
+}
+@media (max-width: 640px) {
+    .news-grid {grid-template-columns: minmax(0, 1fr);}
+}
+.news-card {
+    background-color: white;
+    border: 1px solid #e0e0e0;
+    border-radius: 12px;
+    padding: 20px;
+    margin-bottom: 20px;
+    height: 320px;
+    display: flex;
+    flex-direction: column;
+    justify-content: space-between;
+    box-shadow: 0 2px 5px rgba(0,0,0,0.05);
+    transition: transform 0.2s, box-shadow 0.2s;
+}
+.news-card:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 10px 20px rgba(0,0,0,0.1);
+    border-color: #4a90e2;
+}
+.news-meta {
+    font-size: 11px;
+    color: #95a5a6;
+    margin-bottom: 8px;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+    font-weight: 600;
+}
+.news-title {
+    font-size: 15px;
+    font-weight: 700;
+    color: #2c3e50;
+    line-height: 1.3;
+    margin-bottom: 10px;
+    overflow: hidden;
+    display: -webkit-box;
+    -webkit-line-clamp: 2;
+    -webkit-box-orient: vertical;
+}
+.news-summary {
+    font-size: 13px;
+    color: #555;
+    line-height: 1.5;
+    margin-bottom: 15px;
+    flex-grow: 1;
+    overflow: hidden;
+    display: -webkit-box;
+    -webkit-line-clamp: 4;
+    -webkit-box-orient: vertical;
+}
+.read-more-btn {
+    background-color: #f8f9fa;
+    color: #4a90e2;
+    border: 1px solid #4a90e2;
+    padding: 8px 0;
+    border-radius: 6px;
+    text-align: center;
+    font-size: 13px;
+    font-weight: 600;
+    text-decoration: none;
+    display: block;
+    transition: background 0.2s;
+}
+.read-more-btn:hover {
+    background-color: #4a90e2;
+    color: white;
+}
+a {text-decoration: none;}
+"""
+
+
+def page_count(total, page_size=PAGE_SIZE):
+    return max(1, -(-total // page_size))
+
+
+def safe_href(url):
+    url = (url or "").strip()
+    return html.escape(url, quote=True) if url.lower().startswith(SAFE_SCHEMES) else None
+
+
+@lru_cache(maxsize=1024)
+def render_card(title, link, source, published, summary, read_label):
+    href = safe_href(link)
+    return _CARD(
+        source=html.escape(source or ""),
+        published=html.escape(published or ""),
+        title=html.escape(title or ""),
+        summary=html.escape(summary or ""),
+        link=_LINK(href=href, label=html.escape(read_label)) if href else "",
+    )
+
+
+def source_label(item, shown=3):
+    """Outlets of a card: the collapsed story's sources when there are several."""
+    sources = item.get('sources') or [item['source']]
+    label = " · ".join(sources[:shown])
+    return f"{label} +{len(sources) - shown}" if len(sources) > shown else label
+
+
+def render_page(items, page=0, read_label="Read Article ↗", page_size=PAGE_SIZE):
+    """HTML for one page (0-based) of news items, clamped to the last page."""
+    page = min(max(page, 0), page_count(len(items), page_size) - 1)
+    start = page * page_size
+    cards = "".join(
+        render_card(item['title'], item['link'], source_label(item), item['published'], item['summary'], read_label)
+        for item in items[start:start + page_size]
+    )
+    return _GRID(cards=cards)
@@ -0,0 +1,105 @@
+"""Monte Carlo supply/demand scenarios for the market balance panel.
+
+Each supply region contributes a share of production set by its "Output"
+label. Its "Risk" label, e.g. "High (Frost)", sets how often a harvest
+shock hits the region and how deep it cuts; regions exposed to the same
+hazard are correlated, so one frost can hit Giresun and Ordu together.
+On top of the shocks, production and consumption get independent normal
+noise. All draws for a commodity are sampled as arrays in one pass.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+# Share weight of a region's output label.
+OUTPUT_WEIGHTS = {"Low": 1.0, "Medium": 2.0, "High": 3.0, "Very High": 4.0}
+
+# Yearly shock probability and mean production loss by risk level.
+RISK_LEVELS = {
+    "Low": (0.02, 0.05),
+    "Medium": (0.10, 0.10),
+    "High": (0.20, 0.20),
+    "Critical": (0.35, 0.30),
+}
+
+RISK_PATTERN = re.compile(r"^\s*(\w+)\s*(?:\((.+)\))?")
+
+# stress multiplies every shock probability, correlation is the latent
+# correlation between regions sharing a hazard, and the volatilities are the
+# standard deviations of the relative production/consumption noise.
+Scenario = namedtuple(
+    "Scenario",
+    ["draws", "seed", "stress", "correlation", "supply_volatility", "demand_volatility"],
+    defaults=(20_000, 42, 1.0, 0.6, 0.03, 0.02),
+)
+
+ScenarioResult = namedtuple(
+    "ScenarioResult",
+    ["mean", "quantiles", "deficit_probability", "histogram", "bin_edges", "draws"],
+)
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+BINS = 40
+
+
+def parse_risk(label):
+    """Split a risk label such as "High (Frost)" into (level, hazard)."""
+    match = RISK_PATTERN.match(label or "")
+    level = match.group(1) if match else "Low"
+    hazard = (match.group(2) or "").strip() if match else ""
+    return (level if level in RISK_LEVELS else "Low"), hazard
+
+
+def _shares(zones):
+    weights = np.array([OUTPUT_WEIGHTS.get(output, 1.0) for output, _ in zones])
+    return weights / weights.sum()
+
+
+@lru_cache(maxsize=128)
+def simulate(production, consumption, zones=(), scenario=Scenario()):
+    """Distribution of production minus consumption.
+
+    ``zones`` is a tuple of (Output, Risk) label pairs, one per supply
+    region. The result holds summary statistics and a histogram rather than
+    the raw draws, so memoized results stay small.
+    """
+    rng = np.random.default_rng(scenario.seed)
+    n = scenario.draws
+
+    loss = np.zeros(n)
+    if zones:
+        shares = _shares(zones)
+        levels, hazards = zip(*(parse_risk(risk) for _, risk in zones))
+        probability = np.array([min(RISK_LEVELS[level][0] * scenario.stress, 1.0) for level in levels])
+        severity = np.array([RISK_LEVELS[level][1] for level in levels])
+
+        # Gaussian copula: regions sharing a hazard load on a common factor.
+        hazard_ids = {hazard: i for i, hazard in enumerate(dict.fromkeys(hazards))}
+        common = rng.standard_normal((n, len(hazard_ids)))
+        own = rng.standard_normal((n, len(zones)))
+        rho = np.array([scenario.correlation if hazard else 0.0 for hazard in hazards])
+        latent = np.sqrt(rho) * common[:, [hazard_ids[h] for h in hazards]] + np.sqrt(1 - rho) * own
+        threshold = np.array([NormalDist().inv_cdf(p) for p in np.clip(probability, 1e-9, 1 - 1e-9)])
+        hit = latent < threshold
+
+        # Loss depth ~ Beta with the level's mean severity.
+        a = 2.0
+        depth = rng.beta(a, a * (1 - severity) / severity, (n, len(zones)))
+        loss = (hit * depth) @ shares
+
+    supply_noise = rng.normal(0.0, scenario.supply_volatility, n)
+    demand_noise = rng.normal(0.0, scenario.demand_volatility, n)
+    balance = production * (1 + supply_noise - loss) - consumption * (1 + demand_noise)
+
+    histogram, bin_edges = np.histogram(balance, bins=BINS)
+    return ScenarioResult(
+        mean=float(balance.mean()),
+        quantiles=dict(zip(QUANTILES, np.quantile(balance, QUANTILES).tolist())),
+        deficit_probability=float((balance < 0).mean()),
+        histogram=histogram.tolist(),
+        bin_edges=bin_edges.tolist(),
+        draws=n,
+    )
@@ -0,0 +1,129 @@
+"""LRU mapping bounded by an estimated memory budget.
+
+Entries are weighed once, when stored, with ``approx_size`` (or a caller
+supplied size); the least recently read entries are evicted until the total
+fits ``max_bytes`` and the count fits ``max_entries``. Reads refresh an
+entry's recency, replacing the value of an existing key does not, so
+background refreshes cannot keep an entry alive that nobody reads.
+"""
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+LRUStats = namedtuple("LRUStats", ["hits", "misses", "evictions", "entries", "bytes", "max_bytes"])
+
+_ATOMS = (str, bytes, int, float, bool, type(None))
+
+
+def approx_size(obj):
+    """Rough deep size in bytes of plain data: containers, strings, numbers.
+
+    Shared objects are counted once; other objects count their shallow size.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _ATOMS):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+class SizedLRU:
+    """Thread-safe LRU of at most ``max_bytes`` (estimated) and ``max_entries`` entries.
+
+    A single entry larger than the whole budget is not stored.
+    """
+
+    def __init__(self, max_bytes, max_entries=None, sizeof=approx_size):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def get(self, key, default=None):
+        """Value of ``key``, marking it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """Value of ``key`` without touching its recency or the hit counters."""
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key, value, size=None):
+        """Store ``value``; returns the keys evicted to make room."""
+        size = self._sizeof(value) if size is None else size
+        evicted = []
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                if old is not None:
+                    del self._entries[key]
+                    evicted.append(key)
+                    self.evictions += 1
+                return evicted
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes or (self.max_entries is not None and len(self._entries) > self.max_entries):
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    break
+                self._bytes -= self._entries.pop(oldest)[1]
+                evicted.append(oldest)
+                self.evictions += 1
+        return evicted
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def items(self):
+        """Snapshot of (key, value) pairs, least recently used first."""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return LRUStats(self.hits, self.misses, self.evictions, len(self._entries), self._bytes, self.max_bytes)
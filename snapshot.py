@@ -0,0 +1,379 @@
+"""Static snapshots of the dashboard for every preset combination.
+
+Apart from custom commodities, a page varies only by commodity, language and
+news region, so each preset combination is pre-rendered to a standalone HTML
+page and a JSON document that can be served as static files; live sessions
+are then only needed for custom commodities.
+
+Feeds are fetched once, in the parent, through the news store (a fresh copy
+costs nothing, a stale one a conditional GET) and collapsed with one dedup
+index, as in the app. Every combination gets a fingerprint of all it is
+built from: the dataset version, its news items, its UI strings and the
+renderer's source. Combinations whose fingerprint matches the manifest of
+the previous run, and whose files are still there, are skipped; the rest are
+rendered on a process pool whose workers each load the catalog once.
+
+    python snapshot.py --out .cache/snapshots --workers 4
+"""
+import argparse
+import hashlib
+import html
+import json
+import logging
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import locales
+import news
+import news_grid
+import strict_json
+
+log = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(ROOT, ".cache", "snapshots"))
+MANIFEST = "manifest.json"
+# Same map view as the app.
+MAP_ZOOM = 0.5
+# Cards on a snapshot page; the live app pages through the rest.
+NEWS_ITEMS = 24
+# Every module a page's content passes through, in the parent or the
+# workers: changes to these files change every page.
+RENDERER_SOURCES = (
+    "snapshot.py", "news_grid.py", "figures.py", "catalog.py", "forecast.py", "spatial.py", "scenarios.py",
+    "dataset.py", "locales.py", "news.py", "summary_cleaner.py", "dedup.py",
+)
+
+Job = namedtuple("Job", ["commodity", "lang", "region", "items", "fetched_at", "fingerprint", "out"])
+BuildStats = namedtuple("BuildStats", ["built", "skipped", "failed", "seconds"])
+
+_PAGE = """<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{font-family: "Source Sans Pro", sans-serif; margin: 1rem auto; max-width: 1200px; padding: 0 1rem; color: #31333f;}}
+.top {{display: grid; grid-template-columns: 3fr 2fr; gap: 2rem;}}
+@media (max-width: 900px) {{.top {{grid-template-columns: 1fr;}}}}
+table {{border-collapse: collapse; width: 100%; font-size: 14px;}}
+th, td {{text-align: left; padding: 6px 8px; border-bottom: 1px solid #eee;}}
+.metrics {{display: flex; gap: 2rem;}}
+.metric b {{display: block; font-size: 1.6rem; font-weight: 400;}}
+.caption {{color: #888; font-size: 13px;}}
+{css}
+</style>
+</head>
+<body>
+<h1>{heading}</h1>
+<p>{subtitle}</p>
+<div class="top">
+<section>
+<h3>{supply_zones}: {commodity}</h3>
+{map}
+</section>
+<section>
+<h3>{sector_insights}</h3>
+{sectors}
+<p><b>{market_balance}</b></p>
+{balance}
+<h3>{fact_sheet}</h3>
+{facts}
+</section>
+</div>
+<h3>{news_header}: {commodity} · {region}</h3>
+<p class="caption">{updated}</p>
+{news}
+</body>
+</html>
+"""
+
+
+def slug(commodity):
+    return "-".join(news.fold_query(commodity).split())
+
+
+def page_path(out, commodity, lang, region, ext):
+    return os.path.join(out, lang, region.lower(), f"{slug(commodity)}.{ext}")
+
+
+def combinations():
+    return [(commodity, lang, region) for commodity in news.PRESETS for lang in locales.languages() for region in news.REGIONS]
+
+
+# --- FINGERPRINTS ---
+@lru_cache(maxsize=1)
+def renderer_version():
+    digest = hashlib.sha1()
+    for name in RENDERER_SOURCES:
+        with open(os.path.join(ROOT, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def news_key(items):
+    # What a snapshot shows of its news; the fetch time alone changes nothing.
+    return [(item['guid'], item['title'], item['published'], item.get('sources')) for item in (items or [])[:NEWS_ITEMS]]
+
+
+def fingerprint(dataset_version, lang, items):
+    payload = json.dumps(
+        [renderer_version(), dataset_version, locales.version(lang), news_key(items)],
+        sort_keys=True, ensure_ascii=False, default=list,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# --- NEWS ---
+def fetch_all(store=None, archive=None):
+    """Collapsed items (None if unavailable) and fetch time of every preset feed."""
+    from dedup import DedupIndex
+
+    pairs = news.preset_pairs()
+    fetched = news.fetch_news_batch(pairs, fetch=lambda query, region: news.fetch_feed(
+        query, region, store=store, archive=archive))
+    index = DedupIndex()
+    feeds = {}
+    for pair, items in fetched.items():
+        fetched_at = time.time()
+        if isinstance(items, Exception):
+            log.warning("fetch of %s/%s failed: %s", pair[0], pair[1], items)
+            stored = store.load(news.feed_url(*pair)) if store is not None else None
+            items, fetched_at = (stored.items, stored.fetched_at) if stored is not None else (None, 0.0)
+        elif store is not None:
+            stored = store.load(news.feed_url(*pair))
+            fetched_at = stored.fetched_at if stored is not None else fetched_at
+        feeds[pair] = (index.collapse(items) if items else items, fetched_at)
+    return feeds
+
+
+# --- RENDERING ---
+_catalog = None
+
+
+def _worker_init():
+    global _catalog
+    from catalog import CommodityCatalog
+
+    _catalog = CommodityCatalog()
+
+
+@lru_cache(maxsize=16)
+def map_html(commodity):
+    """Embeddable supply map (plotly.js from its CDN); shared by a commodity's pages."""
+    import plotly.io as pio
+
+    from figures import supply_map_figure
+
+    if not len(_catalog.supply_index(commodity)):
+        return "<p>Map data not available.</p>"
+    figure = supply_map_figure(_catalog.supply_index(commodity).clusters(zoom=MAP_ZOOM), MAP_ZOOM)
+    return pio.to_html(figure, full_html=False, include_plotlyjs="cdn", config={"displayModeBar": False})
+
+
+def page_data(job):
+    """Everything a page shows, as plain JSON-ready data."""
+    market = _catalog.market_balance(job.commodity)
+    sectors = _catalog.sector_insights(job.commodity, job.lang)
+    zones = _catalog.supply_map(job.commodity)
+    items = (job.items or [])[:NEWS_ITEMS]
+    return {
+        "commodity": job.commodity,
+        "lang": job.lang,
+        "region": job.region,
+        "fingerprint": job.fingerprint,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "news_fetched_at": job.fetched_at or None,
+        "market_balance": dict(zip(("production", "consumption", "unit"), market)) if market else None,
+        "forecast": _catalog.balance_forecast(job.commodity),
+        "sectors": sectors.to_dict("records"),
+        "facts": dict(_catalog.facts(job.commodity, job.lang)),
+        "supply_zones": zones.to_dict("records") if not zones.empty else [],
+        "news": None if job.items is None else [
+            {key: item.get(key) for key in ("title", "link", "source", "sources", "published", "summary")}
+            for item in items
+        ],
+    }
+
+
+def _sector_table(rows):
+    cells = "".join(
+        f"<tr><td>{html.escape(str(row['Sector']))}</td><td>{row['Share']}%</td><td>{html.escape(str(row['Status']))}</td></tr>"
+        for row in rows
+    )
+    return f"<table><tr><th>Sector</th><th>Share</th><th>Health</th></tr>{cells}</table>"
+
+
+def _balance(data, t):
+    market = data["market_balance"]
+    if not market:
+        return '<p class="caption">N/A</p>'
+    balance = market["production"] - market["consumption"]
+    unit = html.escape(market["unit"])
+    parts = [
+        '<div class="metrics">',
+        f'<div class="metric">{t["production"]}<b>{market["production"]}</b>{unit}</div>',
+        f'<div class="metric">{t["consumption"]}<b>{market["consumption"]}</b>{unit}</div>',
+        f'<div class="metric">{t["balance"]}<b>{balance:+.2f}</b>{t["surplus"]}</div>',
+        "</div>",
+    ]
+    outlook = data["forecast"]
+    for i, year in enumerate(outlook["years"] if outlook else []):
+        lo, hi = outlook["balance_lo"][i], outlook["balance_hi"][i]
+        interval = f' ({t["interval"]}: {lo:+.2f} … {hi:+.2f})' if math.isfinite(lo) and math.isfinite(hi) else ""
+        parts.append(
+            f'<p class="caption">{t["forecast"]} {year}/{str(year + 1)[2:]}: <b>{outlook["balance"][i]:+.2f}</b>{interval}</p>'
+        )
+    return "\n".join(parts)
+
+
+def _facts(facts, t):
+    return (
+        f'<p><b>{t["sci_desc"]}</b><br><i>{html.escape(facts["desc"])}</i></p>'
+        f'<p><b>{t["top_prod"]}</b> {html.escape(facts["producers"])}</p>'
+        f'<p><b>{t["uses"]}</b> {html.escape(facts["uses"])}</p>'
+        f'<p class="caption">{t["sources_foot"]}</p>'
+    )
+
+
+def render_html(job, data):
+    t = locales.ui(job.lang)
+    if job.items is None:
+        news_html, updated = f"<p>{t['news_error']}</p>", ""
+    elif not job.items:
+        news_html, updated = f"<p>{t['no_news']}</p>", ""
+    else:
+        news_html = news_grid.render_page(job.items, 0, t["read_btn"], page_size=NEWS_ITEMS)
+        updated = f"{t['news_updated']} {time.strftime('%d %b %H:%M', time.gmtime(job.fetched_at))} UTC"
+    return _PAGE.format(
+        lang=job.lang,
+        title=html.escape(f"{t['title']} · {job.commodity}"),
+        css=news_grid.CSS,
+        heading=t["title"],
+        subtitle=t["subtitle"],
+        commodity=html.escape(job.commodity),
+        region=news.region_label(job.region, t),
+        supply_zones=t["supply_zones"],
+        map=map_html(job.commodity),
+        sector_insights=t["sector_insights"],
+        sectors=_sector_table(data["sectors"]),
+        market_balance=t["market_balance"],
+        balance=_balance(data, t),
+        fact_sheet=t["fact_sheet"],
+        facts=_facts(data["facts"], t),
+        news_header=t["news_header"],
+        updated=updated,
+        news=news_html,
+    )
+
+
+def _write(path, text):
+    # Written aside and renamed, so a file being served is never half written.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def build(job):
+    """Render and write one combination."""
+    data = page_data(job)
+    _write(page_path(job.out, job.commodity, job.lang, job.region, "json"),
+           strict_json.dumps(data, ensure_ascii=False))
+    _write(page_path(job.out, job.commodity, job.lang, job.region, "html"), render_html(job, data))
+
+
+def build_batch(jobs):
+    """Build the jobs of one commodity in a pool worker, so its map is made
+    once; returns the error message of each job, None for success."""
+    errors = []
+    for job in jobs:
+        try:
+            build(job)
+        except Exception as e:
+            log.exception("snapshot %s failed", manifest_key(job.commodity, job.lang, job.region))
+            errors.append(f"{type(e).__name__}: {e}")
+        else:
+            errors.append(None)
+    return errors
+
+
+# --- BATCH ---
+def load_manifest(out):
+    try:
+        with open(os.path.join(out, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def manifest_key(commodity, lang, region):
+    return f"{lang}/{region.lower()}/{slug(commodity)}"
+
+
+def build_all(out=DEFAULT_DIR, workers=None, force=False, store=None, archive=None):
+    """Rebuild every combination whose inputs changed; returns BuildStats."""
+    from dataset import open_dataset
+
+    start = time.perf_counter()
+    dataset_version = open_dataset().version
+    feeds = fetch_all(store, archive)
+    manifest = load_manifest(out)
+
+    jobs, skipped = [], 0
+    for commodity, lang, region in combinations():
+        items, fetched_at = feeds[(commodity, region)]
+        key = manifest_key(commodity, lang, region)
+        current = fingerprint(dataset_version, lang, items)
+        unchanged = manifest.get(key, {}).get("fingerprint") == current and all(
+            os.path.exists(page_path(out, commodity, lang, region, ext)) for ext in ("html", "json")
+        )
+        if unchanged and not force:
+            skipped += 1
+            continue
+        jobs.append(Job(commodity, lang, region, items, fetched_at, current, out))
+
+    built = failed = 0
+    if jobs:
+        batches = {}
+        for job in jobs:
+            batches.setdefault(job.commodity, []).append(job)
+        # Each worker pays for its own imports and catalog, so never start
+        # more than there are cores or batches.
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            for batch, errors in zip(batches.values(), pool.map(build_batch, batches.values())):
+                for job, error in zip(batch, errors):
+                    key = manifest_key(job.commodity, job.lang, job.region)
+                    if error is not None:
+                        failed += 1
+                        manifest.pop(key, None)
+                        continue
+                    built += 1
+                    manifest[key] = {
+                        "commodity": job.commodity, "lang": job.lang, "region": job.region,
+                        "fingerprint": job.fingerprint, "built_at": time.time(),
+                    }
+        os.makedirs(out, exist_ok=True)
+        _write(os.path.join(out, MANIFEST), json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True))
+    return BuildStats(built, skipped, failed, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    from feed_store import FeedStore
+    from news_archive import NewsArchive
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=DEFAULT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild every combination")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    stats = build_all(args.out, args.workers, args.force, store=FeedStore(), archive=NewsArchive())
+    print(f"{stats.built} built, {stats.skipped} unchanged, {stats.failed} failed in {stats.seconds:.1f}s -> {args.out}")
@@ -0,0 +1,114 @@
+"""Grid index and server-side clustering for supply regions.
+
+Regions are bucketed into fixed lat/lon cells, stored CSR-style (rows
+sorted by cell, with the start offset of every occupied cell), so a
+bounding-box query only touches the cells it overlaps. Clustering
+aggregates the regions in view on a grid whose cell size follows the map
+zoom, coarsening until the marker budget is met.
+"""
+import numpy as np
+import pandas as pd
+
+from scenarios import OUTPUT_WEIGHTS, RISK_LEVELS, parse_risk
+
+INDEX_CELL_DEG = 1.0
+MAX_MARKERS = 200
+# Cluster cells are about this many pixels wide on a 256px world tile.
+CLUSTER_PX = 40
+
+RISK_RANK = {level: rank for rank, level in enumerate(RISK_LEVELS)}
+WORLD = (-90.0, -180.0, 90.0, 180.0)
+
+
+def _cell_ids(lat, lon, cell_deg):
+    rows = np.floor((np.clip(lat, -90, 89.999999) + 90) / cell_deg).astype(np.int64)
+    cols = np.floor((np.clip(lon, -180, 179.999999) + 180) / cell_deg).astype(np.int64)
+    return rows * int(np.ceil(360 / cell_deg)) + cols
+
+
+def cluster_cell_deg(zoom):
+    return 360.0 / (256 * 2 ** zoom) * CLUSTER_PX
+
+
+class SpatialIndex:
+    """Immutable grid index over one supply map DataFrame (Lat/Lon/Output/Risk)."""
+
+    def __init__(self, frame, cell_deg=INDEX_CELL_DEG):
+        self.frame = frame.reset_index(drop=True)
+        self.cell_deg = cell_deg
+        n = len(self.frame)
+        self.lat = self.frame["Lat"].to_numpy(float) if n else np.empty(0)
+        self.lon = self.frame["Lon"].to_numpy(float) if n else np.empty(0)
+        self.output = np.array([OUTPUT_WEIGHTS.get(o, 1.0) for o in self.frame.get("Output", [])])
+        self.risk = np.array([RISK_RANK[parse_risk(r)[0]] for r in self.frame.get("Risk", [])], dtype=np.int64)
+
+        cells = _cell_ids(self.lat, self.lon, cell_deg)
+        self._order = np.argsort(cells, kind="stable")
+        self._cells, self._starts = np.unique(cells[self._order], return_index=True)
+        self._stops = np.append(self._starts[1:], n)
+        self._row_width = int(np.ceil(360 / cell_deg))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def query(self, bbox=WORLD):
+        """Row positions inside (south, west, north, east); west > east crosses the antimeridian."""
+        south, west, north, east = bbox
+        if west > east:
+            return np.union1d(self.query((south, west, north, 180.0)), self.query((south, -180.0, north, east)))
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        r0, r1 = (np.floor((np.clip([south, north], -90, 89.999999) + 90) / self.cell_deg)).astype(np.int64)
+        c0, c1 = (np.floor((np.clip([west, east], -180, 179.999999) + 180) / self.cell_deg)).astype(np.int64)
+        # Occupied cells whose row and column fall inside the box.
+        rows, cols = np.divmod(self._cells, self._row_width)
+        hit = (rows >= r0) & (rows <= r1) & (cols >= c0) & (cols <= c1)
+        candidates = self._order[np.repeat(hit, self._stops - self._starts)]
+        inside = (
+            (self.lat[candidates] >= south) & (self.lat[candidates] <= north)
+            & (self.lon[candidates] >= west) & (self.lon[candidates] <= east)
+        )
+        return np.sort(candidates[inside])
+
+    def clusters(self, bbox=WORLD, zoom=0.0, max_markers=MAX_MARKERS):
+        """Markers for a viewport: the regions themselves while they fit in
+        ``max_markers``, otherwise one marker per occupied grid cell with the
+        summed output weight, the region count and the worst risk label.
+        """
+        rows = self.query(bbox)
+        if len(rows) <= max_markers:
+            markers = self.frame.iloc[rows].copy()
+            markers["Count"] = 1
+            markers["Size"] = 1.0
+            return markers
+
+        cell_deg = cluster_cell_deg(zoom)
+        while True:
+            cell_of, members = np.unique(_cell_ids(self.lat[rows], self.lon[rows], cell_deg), return_inverse=True)
+            if len(cell_of) <= max_markers:
+                break
+            cell_deg *= 2
+
+        weight = self.output[rows]
+        count = np.bincount(members)
+        total = np.bincount(members, weights=weight)
+        lat = np.bincount(members, weights=self.lat[rows] * weight) / total
+        lon = np.bincount(members, weights=self.lon[rows] * weight) / total
+
+        # Worst risk per cluster: the last row of each cluster after sorting by (cluster, risk).
+        order = np.lexsort((self.risk[rows], members))
+        last = np.append(np.flatnonzero(np.diff(members[order])), len(order) - 1)
+        worst = rows[order[last]]
+
+        risk = self.frame["Risk"].to_numpy()[worst]
+        region = np.where(count == 1, self.frame["Region"].to_numpy()[worst], [f"{c} regions" for c in count])
+        return pd.DataFrame({
+            "Region": region,
+            "Lat": lat,
+            "Lon": lon,
+            "Output": [f"{w:g}" for w in total],
+            "Risk": risk,
+            "Count": count,
+            "Size": np.sqrt(count),
+        })
@@ -0,0 +1,38 @@
+"""JSON that browsers can parse, for data holding numpy and pandas values.
+
+Python's encoder writes NaN and Infinity as bare tokens, which are not JSON
+and which ``JSON.parse`` rejects. Here non-finite floats (numpy ones too)
+become null before encoding, numpy scalars and arrays become plain numbers
+and lists, and pandas' missing values become null. Anything else the encoder
+does not know is written as its string form.
+"""
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def clean(value):
+    """``value`` with every non-finite float replaced by None, recursively."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: clean(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [clean(item) for item in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return clean(value.tolist())
+    return value
+
+
+def _default(value):
+    if hasattr(value, "tolist"):
+        return clean(value.tolist())
+    if pd.isna(value):
+        return None
+    return str(value)
+
+
+def dumps(data, **kwargs):
+    return json.dumps(clean(data), allow_nan=False, default=_default, **kwargs)
@@ -0,0 +1,102 @@
+from html.entities import html5
+from html.parser import HTMLParser
+
+SUMMARY_LIMIT = 200
+
+# Text inside these elements is not visible and is left out of get_text().
+HIDDEN_TAGS = {"script", "style", "template"}
+
+
+class _Enough(Exception):
+    pass
+
+
+class SummaryCleaner(HTMLParser):
+    """Streaming tag stripper producing the same text as BeautifulSoup's get_text().
+
+    Uses the same tokenizer as bs4's "html.parser" builder (with character
+    references left to us, as bs4 does) but keeps no tree, and aborts the
+    parse as soon as one character more than the limit has been seen.
+    """
+
+    def __init__(self, limit=SUMMARY_LIMIT):
+        super().__init__(convert_charrefs=False)
+        self.limit = limit
+
+    def reset(self):
+        super().reset()
+        self._parts = []
+        self._size = 0
+        self._hidden = 0
+
+    def clean(self, raw_summary):
+        if not raw_summary:
+            return ""
+        if "<" not in raw_summary and "&" not in raw_summary:
+            text = raw_summary
+        else:
+            self.reset()
+            try:
+                self.feed(raw_summary)
+                self.close()
+            except _Enough:
+                pass
+            except Exception:
+                return raw_summary[:self.limit]
+            text = "".join(self._parts)
+        if len(text) > self.limit:
+            return text[:self.limit] + "..."
+        return text
+
+    def clean_many(self, raw_summaries):
+        return [self.clean(raw) for raw in raw_summaries]
+
+    # --- TOKEN HANDLERS ---
+    def handle_data(self, data):
+        if self._hidden or not data:
+            return
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size > self.limit:
+            raise _Enough
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS and self._hidden:
+            self._hidden -= 1
+
+    def handle_entityref(self, name):
+        self.handle_data(html5.get(name + ";", "&" + name))
+
+    def handle_charref(self, name):
+        try:
+            code = int(name[1:], 16) if name[:1] in "xX" else int(name)
+        except ValueError:
+            self.handle_data("&#" + name)
+            return
+        data = None
+        if 0 < code < 256:
+            # Numeric references in the 128-159 range usually mean Windows-1252.
+            try:
+                data = bytes([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if data is None:
+            # NUL, surrogates and out-of-range code points are not characters.
+            if code == 0 or 0xD800 <= code <= 0xDFFF or code > 0x10FFFF:
+                data = "\N{REPLACEMENT CHARACTER}"
+            else:
+                data = chr(code)
+        self.handle_data(data)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+
+
+def clean_summaries(raw_summaries, limit=SUMMARY_LIMIT):
+    """Clean a batch of raw HTML summaries with a single parser instance."""
+    return SummaryCleaner(limit).clean_many(raw_summaries)